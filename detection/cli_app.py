@@ -8,8 +8,10 @@ import sys
 import os
 import time
 import io
+import re
+import shutil
 import threading
-from datetime import datetime
+import unicodedata
 from colorama import init, Fore, Back, Style
 
 # Windows编码兼容性设置
@@ -31,20 +33,158 @@ from src.config_loader import ConfigLoader
 
 
 # 全局变量存储最新数据
-latest_data = {}
-data_lock = threading.Lock()
+# 最新数据快照：(版本号, {交易对: 数据})，写入时复制后整体替换，读取无需加锁
+latest_snapshot = (0, {})
+data_lock = threading.Lock()  # 写入锁，只在写入方之间串行
+
+# WebSocket推送合并：短时间内的多次推送先缓存，再一次性发布
+COALESCE_INTERVAL = 0.2  # 合并窗口（秒）
+COALESCE_MAX_UPDATES = 8  # 缓存达到该数量时立即发布
+pending_updates = {}  # 待发布的推送（受pending_lock保护）
+pending_since = 0.0  # 第一条待发布推送的时间
+pending_lock = threading.Lock()
+
+# 增量刷新状态
+PRICE_EPSILON = 1e-12  # 价格变化小于该值视为未变化
+last_prices = {}  # 各交易对上次价格变化时的价格（受data_lock保护）
+drawn_version = -1  # 上一次绘制时的快照版本号
+last_frame = []  # 上一次绘制到屏幕上的各行内容
+last_terminal_size = None  # 上一次绘制时的终端尺寸
+frames_since_full = 0  # 距上次整屏重绘的帧数
+FULL_REPAINT_FRAMES = 20  # 每隔多少帧强制整屏重绘一次，清除日志等其他输出留下的残留
+TIME_ROW = 5  # 更新时间所在行（标题占前5行）
+
+
+# 预先拼接好的ANSI颜色/格式字符串，避免每次刷新重复构建
+RESET = Style.RESET_ALL
+RESET_NEWLINE = Style.RESET_ALL + "\n"  # 每行结束时重置颜色
+CLEAR_SCREEN = "\x1b[2J\x1b[H"  # 清屏并将光标移到左上角
+ANSI_ESCAPE = re.compile(r"(\x1b\[[0-9;]*[A-Za-z])")  # ANSI转义序列（不占显示宽度）
+LINE_DOUBLE = Fore.CYAN + "=" * 80 + Style.RESET_ALL
+LINE_SINGLE = Fore.CYAN + "-" * 80 + Style.RESET_ALL
+HEADER_LINES = (
+    "",
+    LINE_DOUBLE,
+    Fore.YELLOW + Style.BRIGHT + " " * 22 + ">>> 加密货币实时监测系统 <<<",
+    LINE_DOUBLE,
+    ""
+)
+COIN_TITLE_PREFIX = Fore.CYAN + Style.BRIGHT + "【"
+COIN_TITLE_SUFFIX = "】" + Style.RESET_ALL
+LABEL_PRICE = f"  {Fore.WHITE}当前价格:      {Fore.YELLOW}"
+LABEL_CHANGE = f"  {Fore.WHITE}24小时涨跌:    "
+LABEL_VOLUME = f"  {Fore.WHITE}24小时交易量:  {Fore.MAGENTA}$"
+LABEL_HIGH = f"  {Fore.WHITE}24小时最高:    {Fore.GREEN}"
+LABEL_LOW = f"  {Fore.WHITE}24小时最低:    {Fore.RED}"
+LABEL_TIME = f"{Fore.GREEN}更新时间: {Fore.YELLOW}"
+SOURCE_LINE = f"{Fore.GREEN}数据源: {Fore.YELLOW}币安WebSocket (实时推送){Style.RESET_ALL}"
+SUMMARY_TITLE = Fore.GREEN + Style.BRIGHT + "简洁概览:" + Style.RESET_ALL
+WAITING_LINE = f"{Fore.YELLOW}正在等待数据...{Style.RESET_ALL}"
+# 涨跌方向对应的指示符号、文字和颜色
+CHANGE_UP = ("▲", "涨", Fore.GREEN)
+CHANGE_DOWN = ("▼", "跌", Fore.RED)
+CHANGE_FLAT = ("=", "平", Fore.YELLOW)
+
+
+def build_time_line():
+    """
+    构建更新时间行
+    
+    直接用time.localtime的整数字段格式化，避免strftime的区域设置查表开销
+    
+    Returns:
+        带颜色的时间行
+    """
+    tm = time.localtime()
+    return (f"{LABEL_TIME}{tm.tm_year}-{tm.tm_mon:02d}-{tm.tm_mday:02d} "
+            f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}{RESET}")
 
 
 def clear_screen():
-    """清空屏幕"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """清空屏幕（ANSI转义序列，Windows下由colorama转换）"""
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
+
+
+def clip_line(line, width):
+    """
+    将一行裁剪到终端宽度以内，保证一行内容只占一个屏幕行
+    
+    ANSI转义序列不占宽度，中文等宽字符及▲▼等宽度不确定的字符按两列计算（中文Windows控制台下占两列）。
+    
+    Args:
+        line: 行内容（可含ANSI颜色）
+        width: 最大显示宽度
+        
+    Returns:
+        裁剪后的行
+    """
+    # 每个字符最多占两列，字符数不超过宽度一半时无需逐字计算
+    if len(line) * 2 <= width:
+        return line
+    
+    parts = []
+    used = 0
+    for index, token in enumerate(ANSI_ESCAPE.split(line)):
+        if index % 2:
+            # 转义序列原样保留
+            parts.append(token)
+            continue
+        for pos, char in enumerate(token):
+            char_width = 2 if unicodedata.east_asian_width(char) in "WFA" else 1
+            if used + char_width > width:
+                parts.append(token[:pos])
+                return "".join(parts)
+            used += char_width
+        parts.append(token)
+    return "".join(parts)
+
+
+def paint_frame(lines, full=False):
+    """
+    绘制一帧画面
+    
+    与上一帧逐行比较，只通过光标定位重绘有变化的行；
+    首次绘制、行数变化、终端尺寸变化、画面超出终端高度或距上次整屏重绘
+    已达FULL_REPAINT_FRAMES帧时整屏重绘（清除日志输出等造成的错位）。
+    每行裁剪到终端宽度以内，避免长行折行使后续行号错位。
+    所有输出合并为一次write调用。
+    
+    Args:
+        lines: 本帧的行列表（不含换行符）
+        full: 是否强制整屏重绘
+    """
+    global last_frame, last_terminal_size, frames_since_full
+    
+    terminal_size = shutil.get_terminal_size()
+    # 留出最后一列：写满整行时部分终端会立即折行
+    width = terminal_size.columns - 1
+    lines = [clip_line(line, width) for line in lines]
+    
+    frames_since_full += 1
+    if (full or len(lines) != len(last_frame) or len(lines) >= terminal_size.lines
+            or terminal_size != last_terminal_size or frames_since_full >= FULL_REPAINT_FRAMES):
+        # 清屏序列与画面内容合并为同一次写出
+        buf = CLEAR_SCREEN + RESET_NEWLINE.join(lines) + RESET_NEWLINE
+        frames_since_full = 0
+    else:
+        parts = []
+        for row, (line, old_line) in enumerate(zip(lines, last_frame), 1):
+            if line != old_line:
+                parts.append(f"\x1b[{row};1H\x1b[K{line}{RESET}")
+        # 光标停在画面下方
+        parts.append(f"\x1b[{len(lines) + 1};1H")
+        buf = "".join(parts)
+    
+    sys.stdout.write(buf)
+    sys.stdout.flush()
+    last_frame = lines
+    last_terminal_size = terminal_size
 
 
-def print_header():
-    """打印标题"""
-    print("\n" + Fore.CYAN + "=" * 80)
-    print(Fore.YELLOW + Style.BRIGHT + " " * 22 + ">>> 加密货币实时监测系统 <<<")
-    print(Fore.CYAN + "=" * 80 + "\n" + Style.RESET_ALL)
+def print_header(lines):
+    """输出标题"""
+    lines.extend(HEADER_LINES)
 
 
 def format_price(price):
@@ -55,12 +195,13 @@ def format_price(price):
         return f"${price:,.2f}"
 
 
-def print_crypto_info(coin_data):
+def print_crypto_info(coin_data, lines):
     """
-    打印单个币种的详细信息（带颜色）
+    输出单个币种的详细信息（带颜色）
     
     Args:
         coin_data: 币种数据字典
+        lines: 输出行列表
     """
     symbol = coin_data["symbol"]
     price = coin_data["price"]
@@ -71,32 +212,27 @@ def print_crypto_info(coin_data):
     
     # 价格变化方向指示和颜色
     if change_24h > 0:
-        change_indicator = "▲"
-        change_text = "涨"
-        change_color = Fore.GREEN
+        change_indicator, change_text, change_color = CHANGE_UP
     elif change_24h < 0:
-        change_indicator = "▼"
-        change_text = "跌"
-        change_color = Fore.RED
+        change_indicator, change_text, change_color = CHANGE_DOWN
     else:
-        change_indicator = "="
-        change_text = "平"
-        change_color = Fore.YELLOW
+        change_indicator, change_text, change_color = CHANGE_FLAT
     
-    print(f"\n{Fore.CYAN}{Style.BRIGHT}【{symbol}】{Style.RESET_ALL}")
-    print(f"  {Fore.WHITE}当前价格:      {Fore.YELLOW}{format_price(price)}{Style.RESET_ALL}")
-    print(f"  {Fore.WHITE}24小时涨跌:    {change_color}{change_indicator} {change_24h:+.2f}% ({change_text}){Style.RESET_ALL}")
+    lines.append("")
+    lines.append(COIN_TITLE_PREFIX + symbol + COIN_TITLE_SUFFIX)
+    lines.append(LABEL_PRICE + format_price(price) + RESET)
+    lines.append(f"{LABEL_CHANGE}{change_color}{change_indicator} {change_24h:+.2f}% ({change_text}){RESET}")
     
     if volume_24h > 0:
-        print(f"  {Fore.WHITE}24小时交易量:  {Fore.MAGENTA}${volume_24h:,.0f}{Style.RESET_ALL}")
+        lines.append(f"{LABEL_VOLUME}{volume_24h:,.0f}{RESET}")
     
     if high_24h > 0:
-        print(f"  {Fore.WHITE}24小时最高:    {Fore.GREEN}{format_price(high_24h)}{Style.RESET_ALL}")
+        lines.append(LABEL_HIGH + format_price(high_24h) + RESET)
     
     if low_24h > 0:
-        print(f"  {Fore.WHITE}24小时最低:    {Fore.RED}{format_price(low_24h)}{Style.RESET_ALL}")
+        lines.append(LABEL_LOW + format_price(low_24h) + RESET)
     
-    print(Fore.CYAN + "-" * 80 + Style.RESET_ALL)
+    lines.append(LINE_SINGLE)
 
 
 def get_simple_summary(price_data_list):
@@ -124,18 +260,117 @@ def on_price_update(symbol, data):
     """
     价格更新回调函数
     
+    推送先写入缓存，缓存超过合并窗口或达到数量上限时才整体发布，
+    避免每条推送都复制一次快照。显示线程绘制前也会取走缓存。
+    
     Args:
         symbol: 交易对符号（小写）
         data: 格式化的价格数据
     """
-    global latest_data
+    global pending_since
+    with pending_lock:
+        now = time.monotonic()
+        if not pending_updates:
+            pending_since = now
+        pending_updates[symbol] = data
+        if len(pending_updates) < COALESCE_MAX_UPDATES and now - pending_since < COALESCE_INTERVAL:
+            return
+    flush_pending_updates()
+
+
+def flush_pending_updates():
+    """将缓存的推送一次性发布到快照"""
+    global pending_updates
+    with pending_lock:
+        if pending_updates:
+            # 持有pending_lock发布，保证各批次按顺序写入
+            publish_updates(pending_updates)
+            pending_updates = {}
+
+
+def init_snapshot(config):
+    """
+    按配置中的币种顺序预置快照
+    
+    快照字典保持插入顺序，后续更新只替换值不改变顺序，
+    显示时直接按顺序遍历，无需每次排序。
+    
+    Args:
+        config: 配置加载器
+    """
+    global latest_snapshot
+    symbol_map = config.get_symbol_map()
+    trading_pairs = [symbol_map.get(symbol, f"{symbol}USDT").lower()
+                     for symbol in config.get_cryptocurrencies()]
+    with data_lock:
+        latest_snapshot = (0, dict.fromkeys(trading_pairs))
+
+
+def publish_updates(updates):
+    """
+    发布一批价格更新
+    
+    复制当前快照、写入更新后整体替换全局快照引用。
+    读取方直接读取快照引用，无需加锁；写入方之间用data_lock串行。
+    只有价格发生变化时才递增版本号，显示线程据此判断是否需要重绘。
+    
+    Args:
+        updates: 交易对（小写）到格式化价格数据的映射
+    """
+    global latest_snapshot
     with data_lock:
-        latest_data[symbol] = data
+        version, data = latest_snapshot
+        new_data = data.copy()
+        changed = False
+        for symbol, coin_data in updates.items():
+            price = coin_data["price"]
+            if abs(price - last_prices.get(symbol, float("inf"))) > PRICE_EPSILON:
+                last_prices[symbol] = price
+                changed = True
+            new_data[symbol] = coin_data
+        latest_snapshot = (version + 1 if changed else version, new_data)
+
+
+def build_frame(current_data):
+    """
+    构建完整的一帧画面
+    
+    Args:
+        current_data: 按配置顺序排列的币种数据列表
+        
+    Returns:
+        行列表
+    """
+    lines = []
+    print_header(lines)
+    
+    # 显示更新时间
+    lines.append(build_time_line())
+    lines.append(SOURCE_LINE)
+    lines.append("")
+    lines.append(LINE_DOUBLE)
+    
+    if current_data:
+        # 显示每个币种的信息
+        for coin in current_data:
+            print_crypto_info(coin, lines)
+        
+        # 显示简洁摘要
+        lines.append("")
+        lines.append(LINE_DOUBLE)
+        lines.append(SUMMARY_TITLE)
+        lines.append(Fore.WHITE + get_simple_summary(current_data) + RESET)
+        lines.append(LINE_DOUBLE)
+    else:
+        lines.append("")
+        lines.append(WAITING_LINE)
+    
+    return lines
 
 
 def display_loop(ws_client, config):
     """显示循环"""
-    global latest_data
+    global drawn_version
     
     print(f"\n{Fore.GREEN}WebSocket已连接，正在接收实时数据...{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}数据将实时更新显示（每3秒刷新屏幕）{Style.RESET_ALL}")
@@ -144,37 +379,22 @@ def display_loop(ws_client, config):
     
     try:
         while True:
-            # 清空屏幕
-            clear_screen()
+            # 取走尚未发布的推送，再读取最新快照，版本号变化说明有价格变化
+            flush_pending_updates()
+            version, data = latest_snapshot
+            changed = version != drawn_version
+            drawn_version = version
+            # 快照已按配置顺序排列，跳过尚未收到数据的交易对
+            current_data = [coin for coin in data.values() if coin is not None]
             
-            # 打印标题
-            print_header()
-            
-            # 显示更新时间
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"{Fore.GREEN}更新时间: {Fore.YELLOW}{current_time}{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}数据源: {Fore.YELLOW}币安WebSocket (实时推送){Style.RESET_ALL}\n")
-            print(Fore.CYAN + "=" * 80 + Style.RESET_ALL)
-            
-            # 获取当前数据
-            with data_lock:
-                current_data = list(latest_data.values())
-            
-            if current_data:
-                # 按币种排序
-                current_data.sort(key=lambda x: x["symbol"])
-                
-                # 显示每个币种的信息
-                for coin in current_data:
-                    print_crypto_info(coin)
-                
-                # 显示简洁摘要
-                print("\n" + Fore.CYAN + "=" * 80)
-                print(Fore.GREEN + Style.BRIGHT + "简洁概览:" + Style.RESET_ALL)
-                print(Fore.WHITE + get_simple_summary(current_data) + Style.RESET_ALL)
-                print(Fore.CYAN + "=" * 80 + Style.RESET_ALL)
+            if changed or not last_frame:
+                lines = build_frame(current_data)
             else:
-                print(f"\n{Fore.YELLOW}正在等待数据...{Style.RESET_ALL}")
+                # 价格无变化，只更新时间行
+                lines = list(last_frame)
+                lines[TIME_ROW] = build_time_line()
+            
+            paint_frame(lines)
             
             # 每3秒刷新一次显示
             time.sleep(3)
@@ -196,6 +416,7 @@ def main():
     
     # 获取监测币种
     symbols = config.get_cryptocurrencies()
+    init_snapshot(config)
     
     print(f"\n{Fore.GREEN}>>> 正在启动加密货币实时监测系统...{Style.RESET_ALL}")
     print(f"{Fore.CYAN}数据源: {Fore.YELLOW}币安WebSocket{Style.RESET_ALL}")
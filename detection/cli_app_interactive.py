@@ -9,8 +9,10 @@ import sys
 import os
 import time
 import io
+import re
+import shutil
 import threading
-from datetime import datetime
+import unicodedata
 from colorama import init, Fore, Back, Style
 
 # Windows专用模块
@@ -39,36 +41,207 @@ from typing import Dict, Any
 
 
 # 全局变量
-latest_data = {}
-data_lock = threading.Lock()
+# 最新数据快照：(版本号, {交易对: 数据})，写入时复制后整体替换，读取无需加锁
+latest_snapshot = (0, {})
+data_lock = threading.Lock()  # 写入锁，只在写入方之间串行
+
+# WebSocket推送合并：短时间内的多次推送先缓存，再一次性发布
+COALESCE_INTERVAL = 0.2  # 合并窗口（秒）
+COALESCE_MAX_UPDATES = 8  # 缓存达到该数量时立即发布
+pending_updates = {}  # 待发布的推送（受pending_lock保护）
+pending_since = 0.0  # 第一条待发布推送的时间
+pending_lock = threading.Lock()
 realtime_mode = True  # 实时模式开关
-ws_client = None
 running = True
-need_refresh = False  # 需要刷新标志
+display_cond = threading.Condition()  # 显示线程等待刷新通知的条件变量
+need_full_redraw = False  # 需要整屏重绘（手动刷新、模式切换、分析结束，受display_cond保护）
+tick_pending = False  # 实时模式定时刷新到期（受display_cond保护）
+REFRESH_INTERVAL = 3  # 实时模式刷新间隔（秒）
+WAIT_TIMEOUT = 1.0  # 单次wait的超时时间（Windows下无超时的wait无法被Ctrl+C中断）
+
+# 增量刷新状态
+PRICE_EPSILON = 1e-12  # 价格变化小于该值视为未变化
+last_prices = {}  # 各交易对上次价格变化时的价格（受data_lock保护）
+drawn_version = -1  # 上一次绘制时的快照版本号
+last_frame = []  # 上一次绘制到屏幕上的各行内容
+last_terminal_size = None  # 上一次绘制时的终端尺寸
+frames_since_full = 0  # 距上次整屏重绘的帧数
+FULL_REPAINT_FRAMES = 20  # 每隔多少帧强制整屏重绘一次，清除日志等其他输出留下的残留
+TIME_ROW = 5  # 更新时间所在行（标题占前5行）
+
+
+class AppContext:
+    """应用上下文：启动时创建一次并复用的共享对象"""
+    
+    def __init__(self, config: ConfigLoader):
+        """
+        初始化应用上下文
+        
+        Args:
+            config: 配置加载器
+        """
+        self.config = config
+        # 复用同一个HTTP会话，保持keep-alive连接，避免每次操作重新握手
+        self.kline_client = BinanceKlineData(config.get_api_url())
+        self.advisor = TradingAdvisor()
+
+
+# 预先拼接好的ANSI颜色/格式字符串，避免每次刷新重复构建
+RESET = Style.RESET_ALL
+RESET_NEWLINE = Style.RESET_ALL + "\n"  # 每行结束时重置颜色
+CLEAR_SCREEN = "\x1b[2J\x1b[H"  # 清屏并将光标移到左上角
+ANSI_ESCAPE = re.compile(r"(\x1b\[[0-9;]*[A-Za-z])")  # ANSI转义序列（不占显示宽度）
+LINE_DOUBLE = Fore.CYAN + "=" * 80 + Style.RESET_ALL
+LINE_SINGLE = Fore.CYAN + "-" * 80 + Style.RESET_ALL
+HEADER_LINES = (
+    "",
+    LINE_DOUBLE,
+    Fore.YELLOW + Style.BRIGHT + " " * 20 + ">>> 加密货币智能监测系统 <<<",
+    LINE_DOUBLE,
+    ""
+)
+COIN_TITLE_PREFIX = Fore.CYAN + Style.BRIGHT + "【"
+COIN_TITLE_SUFFIX = "】" + Style.RESET_ALL
+LABEL_PRICE = f"  {Fore.WHITE}当前价格:      {Fore.YELLOW}"
+LABEL_CHANGE = f"  {Fore.WHITE}24小时涨跌:    "
+LABEL_VOLUME = f"  {Fore.WHITE}24小时交易量:  {Fore.MAGENTA}$"
+LABEL_HIGH = f"  {Fore.WHITE}24小时最高:    {Fore.GREEN}"
+LABEL_LOW = f"  {Fore.WHITE}24小时最低:    {Fore.RED}"
+LABEL_TIME = f"{Fore.GREEN}更新时间: {Fore.YELLOW}"
+SOURCE_LINE = f"{Fore.GREEN}数据源: {Fore.YELLOW}币安WebSocket{Style.RESET_ALL}"
+MODE_LINE_REALTIME = f"{Fore.GREEN}模式: {Fore.GREEN}实时推送中{Style.RESET_ALL}"
+MODE_LINE_PAUSED = f"{Fore.GREEN}模式: {Fore.YELLOW}已暂停（按R手动刷新）{Style.RESET_ALL}"
+SUMMARY_TITLE = Fore.GREEN + Style.BRIGHT + "简洁概览:" + Style.RESET_ALL
+WAITING_LINE = f"{Fore.YELLOW}正在等待数据...{Style.RESET_ALL}"
+# 涨跌方向对应的指示符号、文字和颜色
+CHANGE_UP = ("▲", "涨", Fore.GREEN)
+CHANGE_DOWN = ("▼", "跌", Fore.RED)
+CHANGE_FLAT = ("=", "平", Fore.YELLOW)
+
+
+def _build_control_lines(mode_status):
+    """构建控制说明的各行"""
+    return (
+        "",
+        LINE_DOUBLE,
+        f"{Fore.WHITE}控制面板:{Style.RESET_ALL}",
+        f"  {Fore.GREEN}[空格]{Style.RESET_ALL} 切换实时/暂停模式  {mode_status}{Style.RESET_ALL}",
+        f"  {Fore.GREEN}[R]{Style.RESET_ALL}     手动刷新数据",
+        f"  {Fore.GREEN}[A]{Style.RESET_ALL}     技术分析（获取历史数据）",
+        f"  {Fore.GREEN}[Q]{Style.RESET_ALL}     退出程序",
+        LINE_DOUBLE,
+        ""
+    )
+
+
+CONTROL_LINES_REALTIME = _build_control_lines(f"{Fore.GREEN}实时推送中")
+CONTROL_LINES_PAUSED = _build_control_lines(f"{Fore.YELLOW}已暂停")
+
+
+def build_time_line():
+    """
+    构建更新时间行
+    
+    直接用time.localtime的整数字段格式化，避免strftime的区域设置查表开销
+    
+    Returns:
+        带颜色的时间行
+    """
+    tm = time.localtime()
+    return (f"{LABEL_TIME}{tm.tm_year}-{tm.tm_mon:02d}-{tm.tm_mday:02d} "
+            f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}{RESET}")
 
 
 def clear_screen():
-    """清空屏幕"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """清空屏幕（ANSI转义序列，Windows下由colorama转换）"""
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
+
+
+def clip_line(line, width):
+    """
+    将一行裁剪到终端宽度以内，保证一行内容只占一个屏幕行
+    
+    ANSI转义序列不占宽度，中文等宽字符及▲▼等宽度不确定的字符按两列计算（中文Windows控制台下占两列）。
+    
+    Args:
+        line: 行内容（可含ANSI颜色）
+        width: 最大显示宽度
+        
+    Returns:
+        裁剪后的行
+    """
+    # 每个字符最多占两列，字符数不超过宽度一半时无需逐字计算
+    if len(line) * 2 <= width:
+        return line
+    
+    parts = []
+    used = 0
+    for index, token in enumerate(ANSI_ESCAPE.split(line)):
+        if index % 2:
+            # 转义序列原样保留
+            parts.append(token)
+            continue
+        for pos, char in enumerate(token):
+            char_width = 2 if unicodedata.east_asian_width(char) in "WFA" else 1
+            if used + char_width > width:
+                parts.append(token[:pos])
+                return "".join(parts)
+            used += char_width
+        parts.append(token)
+    return "".join(parts)
+
+
+def paint_frame(lines, full=False):
+    """
+    绘制一帧画面
+    
+    与上一帧逐行比较，只通过光标定位重绘有变化的行；
+    首次绘制、行数变化、终端尺寸变化、画面超出终端高度或距上次整屏重绘
+    已达FULL_REPAINT_FRAMES帧时整屏重绘（清除日志输出等造成的错位）。
+    每行裁剪到终端宽度以内，避免长行折行使后续行号错位。
+    所有输出合并为一次write调用。
+    
+    Args:
+        lines: 本帧的行列表（不含换行符）
+        full: 是否强制整屏重绘
+    """
+    global last_frame, last_terminal_size, frames_since_full
+    
+    terminal_size = shutil.get_terminal_size()
+    # 留出最后一列：写满整行时部分终端会立即折行
+    width = terminal_size.columns - 1
+    lines = [clip_line(line, width) for line in lines]
+    
+    frames_since_full += 1
+    if (full or len(lines) != len(last_frame) or len(lines) >= terminal_size.lines
+            or terminal_size != last_terminal_size or frames_since_full >= FULL_REPAINT_FRAMES):
+        # 清屏序列与画面内容合并为同一次写出
+        buf = CLEAR_SCREEN + RESET_NEWLINE.join(lines) + RESET_NEWLINE
+        frames_since_full = 0
+    else:
+        parts = []
+        for row, (line, old_line) in enumerate(zip(lines, last_frame), 1):
+            if line != old_line:
+                parts.append(f"\x1b[{row};1H\x1b[K{line}{RESET}")
+        # 光标停在画面下方
+        parts.append(f"\x1b[{len(lines) + 1};1H")
+        buf = "".join(parts)
+    
+    sys.stdout.write(buf)
+    sys.stdout.flush()
+    last_frame = lines
+    last_terminal_size = terminal_size
 
 
-def print_header():
-    """打印标题"""
-    print("\n" + Fore.CYAN + "=" * 80)
-    print(Fore.YELLOW + Style.BRIGHT + " " * 20 + ">>> 加密货币智能监测系统 <<<")
-    print(Fore.CYAN + "=" * 80 + "\n" + Style.RESET_ALL)
+def print_header(lines):
+    """输出标题"""
+    lines.extend(HEADER_LINES)
 
 
-def print_controls():
-    """打印控制说明"""
-    mode_status = f"{Fore.GREEN}实时推送中" if realtime_mode else f"{Fore.YELLOW}已暂停"
-    print(f"\n{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}控制面板:{Style.RESET_ALL}")
-    print(f"  {Fore.GREEN}[空格]{Style.RESET_ALL} 切换实时/暂停模式  {mode_status}{Style.RESET_ALL}")
-    print(f"  {Fore.GREEN}[R]{Style.RESET_ALL}     手动刷新数据")
-    print(f"  {Fore.GREEN}[A]{Style.RESET_ALL}     技术分析（获取历史数据）")
-    print(f"  {Fore.GREEN}[Q]{Style.RESET_ALL}     退出程序")
-    print(f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}\n")
+def print_controls(lines):
+    """输出控制说明"""
+    lines.extend(CONTROL_LINES_REALTIME if realtime_mode else CONTROL_LINES_PAUSED)
 
 
 def format_price(price):
@@ -79,8 +252,8 @@ def format_price(price):
         return f"${price:,.2f}"
 
 
-def print_crypto_info(coin_data):
-    """打印单个币种的详细信息"""
+def print_crypto_info(coin_data, lines):
+    """输出单个币种的详细信息"""
     symbol = coin_data["symbol"]
     price = coin_data["price"]
     change_24h = coin_data["change_24h"]
@@ -90,32 +263,27 @@ def print_crypto_info(coin_data):
     
     # 价格变化方向指示和颜色
     if change_24h > 0:
-        change_indicator = "▲"
-        change_text = "涨"
-        change_color = Fore.GREEN
+        change_indicator, change_text, change_color = CHANGE_UP
     elif change_24h < 0:
-        change_indicator = "▼"
-        change_text = "跌"
-        change_color = Fore.RED
+        change_indicator, change_text, change_color = CHANGE_DOWN
     else:
-        change_indicator = "="
-        change_text = "平"
-        change_color = Fore.YELLOW
+        change_indicator, change_text, change_color = CHANGE_FLAT
     
-    print(f"\n{Fore.CYAN}{Style.BRIGHT}【{symbol}】{Style.RESET_ALL}")
-    print(f"  {Fore.WHITE}当前价格:      {Fore.YELLOW}{format_price(price)}{Style.RESET_ALL}")
-    print(f"  {Fore.WHITE}24小时涨跌:    {change_color}{change_indicator} {change_24h:+.2f}% ({change_text}){Style.RESET_ALL}")
+    lines.append("")
+    lines.append(COIN_TITLE_PREFIX + symbol + COIN_TITLE_SUFFIX)
+    lines.append(LABEL_PRICE + format_price(price) + RESET)
+    lines.append(f"{LABEL_CHANGE}{change_color}{change_indicator} {change_24h:+.2f}% ({change_text}){RESET}")
     
     if volume_24h > 0:
-        print(f"  {Fore.WHITE}24小时交易量:  {Fore.MAGENTA}${volume_24h:,.0f}{Style.RESET_ALL}")
+        lines.append(f"{LABEL_VOLUME}{volume_24h:,.0f}{RESET}")
     
     if high_24h > 0:
-        print(f"  {Fore.WHITE}24小时最高:    {Fore.GREEN}{format_price(high_24h)}{Style.RESET_ALL}")
+        lines.append(LABEL_HIGH + format_price(high_24h) + RESET)
     
     if low_24h > 0:
-        print(f"  {Fore.WHITE}24小时最低:    {Fore.RED}{format_price(low_24h)}{Style.RESET_ALL}")
+        lines.append(LABEL_LOW + format_price(low_24h) + RESET)
     
-    print(Fore.CYAN + "-" * 80 + Style.RESET_ALL)
+    lines.append(LINE_SINGLE)
 
 
 def get_simple_summary(price_data_list):
@@ -140,109 +308,228 @@ def get_simple_summary(price_data_list):
 
 
 def on_price_update(symbol, data):
-    """价格更新回调函数"""
-    global latest_data
-    if realtime_mode:
-        with data_lock:
-            latest_data[symbol] = data
+    """
+    价格更新回调函数
+    
+    推送先写入缓存，缓存超过合并窗口或达到数量上限时才整体发布，
+    避免每条推送都复制一次快照。显示线程绘制前也会取走缓存。
+    
+    Args:
+        symbol: 交易对符号（小写）
+        data: 格式化的价格数据
+    """
+    global pending_since
+    if not realtime_mode:
+        return
+    with pending_lock:
+        now = time.monotonic()
+        if not pending_updates:
+            pending_since = now
+        pending_updates[symbol] = data
+        if len(pending_updates) < COALESCE_MAX_UPDATES and now - pending_since < COALESCE_INTERVAL:
+            return
+    flush_pending_updates()
+
+
+def flush_pending_updates():
+    """将缓存的推送一次性发布到快照"""
+    global pending_updates
+    with pending_lock:
+        if pending_updates:
+            # 持有pending_lock发布，保证各批次按顺序写入
+            publish_updates(pending_updates)
+            pending_updates = {}
+
+
+def init_snapshot(config):
+    """
+    按配置中的币种顺序预置快照
+    
+    快照字典保持插入顺序，后续更新只替换值不改变顺序，
+    显示时直接按顺序遍历，无需每次排序。
+    
+    Args:
+        config: 配置加载器
+    """
+    global latest_snapshot
+    symbol_map = config.get_symbol_map()
+    trading_pairs = [symbol_map.get(symbol, f"{symbol}USDT").lower()
+                     for symbol in config.get_cryptocurrencies()]
+    with data_lock:
+        latest_snapshot = (0, dict.fromkeys(trading_pairs))
 
 
-def manual_refresh(config):
-    """手动刷新数据"""
-    global latest_data, need_refresh
+def publish_updates(updates):
+    """
+    发布一批价格更新
     
+    复制当前快照、写入更新后整体替换全局快照引用。
+    读取方直接读取快照引用，无需加锁；写入方之间用data_lock串行。
+    只有价格发生变化时才递增版本号，显示线程据此判断是否需要重绘。
+    
+    Args:
+        updates: 交易对（小写）到格式化价格数据的映射
+    """
+    global latest_snapshot
+    with data_lock:
+        version, data = latest_snapshot
+        new_data = data.copy()
+        changed = False
+        for symbol, coin_data in updates.items():
+            price = coin_data["price"]
+            if abs(price - last_prices.get(symbol, float("inf"))) > PRICE_EPSILON:
+                last_prices[symbol] = price
+                changed = True
+            new_data[symbol] = coin_data
+        latest_snapshot = (version + 1 if changed else version, new_data)
+
+
+def request_refresh(full=True):
+    """
+    通知显示线程刷新
+    
+    Args:
+        full: True为立即整屏重绘，False为定时刷新
+    """
+    global need_full_redraw, tick_pending
+    
+    with display_cond:
+        if full:
+            need_full_redraw = True
+        else:
+            tick_pending = True
+        display_cond.notify()
+
+
+def heartbeat():
+    """定时刷新线程：实时模式下每隔REFRESH_INTERVAL秒通知显示线程一次"""
+    while running:
+        time.sleep(REFRESH_INTERVAL)
+        if running and realtime_mode:
+            request_refresh(full=False)
+
+
+def manual_refresh(ctx: AppContext):
+    """手动刷新数据"""
     print(f"\n{Fore.YELLOW}正在手动获取最新数据...{Style.RESET_ALL}")
     
-    kline_client = BinanceKlineData()
-    symbols = config.get_cryptocurrencies()
-    symbol_map = config.get_symbol_map()
+    kline_client = ctx.kline_client
+    symbols = ctx.config.get_cryptocurrencies()
+    symbol_map = ctx.config.get_symbol_map()
+    trading_pairs = {symbol: symbol_map.get(symbol, f"{symbol}USDT") for symbol in symbols}
     
-    with data_lock:
-        for symbol in symbols:
-            trading_pair = symbol_map.get(symbol, f"{symbol}USDT")
-            price_data = kline_client.get_current_price(trading_pair)
-            
-            if price_data:
-                latest_data[trading_pair.lower()] = {
-                    "symbol": symbol,
-                    "price": price_data["price"],
-                    "change_24h": price_data["change_24h"],
-                    "volume_24h": price_data["volume_24h"],
-                    "high_24h": price_data["high_24h"],
-                    "low_24h": price_data["low_24h"]
-                }
-    
-    need_refresh = True  # 标记需要刷新显示
+    # 一次请求获取所有交易对，避免逐个串行请求
+    prices = kline_client.get_current_prices(list(trading_pairs.values()))
+    
+    updates = {}
+    for symbol, trading_pair in trading_pairs.items():
+        price_data = prices.get(trading_pair.upper())
+        
+        if price_data:
+            updates[trading_pair.lower()] = {
+                "symbol": symbol,
+                "price": price_data["price"],
+                "change_24h": price_data["change_24h"],
+                "volume_24h": price_data["volume_24h"],
+                "high_24h": price_data["high_24h"],
+                "low_24h": price_data["low_24h"]
+            }
+    # 先发布缓存中较早的推送，避免其覆盖手动获取的数据
+    flush_pending_updates()
+    publish_updates(updates)
+    
+    request_refresh()  # 通知显示线程刷新
     print(f"{Fore.GREEN}✓ 数据刷新完成{Style.RESET_ALL}")
     time.sleep(0.5)
 
 
-def perform_technical_analysis(config):
+def write_lines(lines):
+    """将行列表一次性写出（单次write，避免逐行print）"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def perform_technical_analysis(ctx: AppContext):
     """执行技术分析（获取历史数据并进行专业分析）"""
     clear_screen()
-    print_header()
-    
-    print(f"{Fore.YELLOW}{Style.BRIGHT}>>> 专业技术分析系统 <<<{Style.RESET_ALL}\n")
-    print(f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}分析理论：斐波那契、波浪理论、缠论、威科夫交易法{Style.RESET_ALL}")
-    print(f"{Fore.WHITE}技术指标：MA、MACD、KDJ、BOLL、RSI、ATR{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}\n")
-    
-    kline_client = BinanceKlineData()
-    advisor = TradingAdvisor()
-    symbols = config.get_cryptocurrencies()
-    symbol_map = config.get_symbol_map()
-    
-    for symbol in symbols:
-        trading_pair = symbol_map.get(symbol, f"{symbol}USDT")
-        
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}{'█' * 80}{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}{Style.BRIGHT}正在分析 {symbol} ({trading_pair})...{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}{Style.BRIGHT}{'█' * 80}{Style.RESET_ALL}\n")
-        
-        # 获取足够的K线数据用于分析（100根1小时K线）
-        print(f"{Fore.CYAN}[1/5] 获取K线数据...{Style.RESET_ALL}")
-        klines = kline_client.get_klines(trading_pair, "1h", 100)
+    lines = []
+    print_header(lines)
+    lines.extend([
+        f"{Fore.YELLOW}{Style.BRIGHT}>>> 专业技术分析系统 <<<{Style.RESET_ALL}\n",
+        f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}",
+        f"{Fore.WHITE}分析理论：斐波那契、波浪理论、缠论、威科夫交易法{Style.RESET_ALL}",
+        f"{Fore.WHITE}技术指标：MA、MACD、KDJ、BOLL、RSI、ATR{Style.RESET_ALL}",
+        f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}\n"
+    ])
+    write_lines(lines)
+    
+    kline_client = ctx.kline_client
+    advisor = ctx.advisor
+    symbols = ctx.config.get_cryptocurrencies()
+    symbol_map = ctx.config.get_symbol_map()
+    trading_pairs = {symbol: symbol_map.get(symbol, f"{symbol}USDT") for symbol in symbols}
+    
+    # 并发获取所有币种的K线数据（每个币种100根1小时K线），总耗时约为一次请求
+    write_lines([f"{Fore.CYAN}正在获取所有币种的K线数据...{Style.RESET_ALL}"])
+    klines_by_pair = kline_client.get_klines_for_multiple_symbols(list(trading_pairs.values()), "1h", 100)
+    
+    for symbol, trading_pair in trading_pairs.items():
+        # 该币种的分析报告先写入缓冲，完成后一次性输出
+        lines = [
+            f"\n{Fore.GREEN}{Style.BRIGHT}{'█' * 80}{Style.RESET_ALL}",
+            f"{Fore.YELLOW}{Style.BRIGHT}正在分析 {symbol} ({trading_pair})...{Style.RESET_ALL}",
+            f"{Fore.GREEN}{Style.BRIGHT}{'█' * 80}{Style.RESET_ALL}\n",
+            f"{Fore.CYAN}[1/5] 获取K线数据...{Style.RESET_ALL}"
+        ]
         
+        klines = klines_by_pair.get(trading_pair)
         if not klines or len(klines) < 30:
-            print(f"{Fore.RED}✗ K线数据不足，跳过{Style.RESET_ALL}\n")
+            lines.append(f"{Fore.RED}✗ K线数据不足，跳过{Style.RESET_ALL}\n")
+            write_lines(lines)
             continue
         
-        print(f"{Fore.GREEN}✓ 成功获取 {len(klines)} 根K线{Style.RESET_ALL}")
+        lines.extend([
+            f"{Fore.GREEN}✓ 成功获取 {len(klines)} 根K线{Style.RESET_ALL}",
+            f"{Fore.CYAN}[2/5] 计算技术指标...{Style.RESET_ALL}"
+        ])
         
         # 进行综合分析
-        print(f"{Fore.CYAN}[2/5] 计算技术指标...{Style.RESET_ALL}")
         try:
             analysis = advisor.analyze_comprehensive(klines)
             
             if "error" in analysis:
-                print(f"{Fore.RED}✗ {analysis['error']}{Style.RESET_ALL}\n")
+                lines.append(f"{Fore.RED}✗ {analysis['error']}{Style.RESET_ALL}\n")
+                write_lines(lines)
                 continue
             
-            print(f"{Fore.GREEN}✓ 指标计算完成{Style.RESET_ALL}")
+            lines.append(f"{Fore.GREEN}✓ 指标计算完成{Style.RESET_ALL}")
             
             # 显示分析结果
-            print(f"\n{Fore.CYAN}[3/5] 技术指标分析{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
-            display_indicator_analysis(analysis)
+            lines.append(f"\n{Fore.CYAN}[3/5] 技术指标分析{Style.RESET_ALL}")
+            lines.append(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
+            display_indicator_analysis(analysis, lines)
             
-            print(f"\n{Fore.CYAN}[4/5] 交易理论分析{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
-            display_theory_analysis(analysis)
+            lines.append(f"\n{Fore.CYAN}[4/5] 交易理论分析{Style.RESET_ALL}")
+            lines.append(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
+            display_theory_analysis(analysis, lines)
             
-            print(f"\n{Fore.CYAN}[5/5] 交易建议{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
-            display_trading_recommendations(symbol, analysis)
+            lines.append(f"\n{Fore.CYAN}[5/5] 交易建议{Style.RESET_ALL}")
+            lines.append(f"{Fore.CYAN}{'-' * 80}{Style.RESET_ALL}")
+            display_trading_recommendations(symbol, analysis, lines)
+            write_lines(lines)
             
         except Exception as e:
-            print(f"{Fore.RED}✗ 分析出错: {e}{Style.RESET_ALL}")
+            lines.append(f"{Fore.RED}✗ 分析出错: {e}{Style.RESET_ALL}")
+            write_lines(lines)
             import traceback
             traceback.print_exc()
     
-    print(f"\n{Fore.GREEN}{Style.BRIGHT}{'=' * 80}{Style.RESET_ALL}")
-    print(f"{Fore.GREEN}{Style.BRIGHT}所有币种分析完成！{Style.RESET_ALL}")
-    print(f"{Fore.GREEN}{Style.BRIGHT}{'=' * 80}{Style.RESET_ALL}")
-    print(f"\n{Fore.YELLOW}按任意键返回主界面...{Style.RESET_ALL}")
+    write_lines([
+        f"\n{Fore.GREEN}{Style.BRIGHT}{'=' * 80}{Style.RESET_ALL}",
+        f"{Fore.GREEN}{Style.BRIGHT}所有币种分析完成！{Style.RESET_ALL}",
+        f"{Fore.GREEN}{Style.BRIGHT}{'=' * 80}{Style.RESET_ALL}",
+        f"\n{Fore.YELLOW}按任意键返回主界面...{Style.RESET_ALL}"
+    ])
     
     # 等待按键
     if sys.platform == 'win32':
@@ -251,262 +538,278 @@ def perform_technical_analysis(config):
         input()
 
 
-def display_indicator_analysis(analysis: Dict):
-    """显示技术指标分析结果"""
+def display_indicator_analysis(analysis: Dict, lines):
+    """显示技术指标分析结果（追加到行列表）"""
     indicators = analysis["indicators"]
     
     # MA均线
     ma = indicators["MA"]
-    print(f"\n{Fore.WHITE}【MA均线】{Style.RESET_ALL}")
-    print(f"  趋势: {Fore.YELLOW}{ma['trend']}{Style.RESET_ALL} (评分: {ma['score']})")
+    lines.append(f"\n{Fore.WHITE}【MA均线】{Style.RESET_ALL}")
+    lines.append(f"  趋势: {Fore.YELLOW}{ma['trend']}{Style.RESET_ALL} (评分: {ma['score']})")
     for signal in ma['signals'][:3]:
-        print(f"  • {signal}")
+        lines.append(f"  • {signal}")
     
     # MACD
     macd = indicators["MACD"]
-    print(f"\n{Fore.WHITE}【MACD】{Style.RESET_ALL}")
-    print(f"  信号: {Fore.YELLOW}{macd['signal']}{Style.RESET_ALL} (评分: {macd['score']:.1f})")
+    lines.append(f"\n{Fore.WHITE}【MACD】{Style.RESET_ALL}")
+    lines.append(f"  信号: {Fore.YELLOW}{macd['signal']}{Style.RESET_ALL} (评分: {macd['score']:.1f})")
     for detail in macd['details']:
-        print(f"  • {detail}")
+        lines.append(f"  • {detail}")
     
     # KDJ
     kdj = indicators["KDJ"]
-    print(f"\n{Fore.WHITE}【KDJ】{Style.RESET_ALL}")
-    print(f"  信号: {Fore.YELLOW}{kdj['signal']}{Style.RESET_ALL} (K:{kdj['values']['K']:.2f} D:{kdj['values']['D']:.2f} J:{kdj['values']['J']:.2f})")
+    lines.append(f"\n{Fore.WHITE}【KDJ】{Style.RESET_ALL}")
+    lines.append(f"  信号: {Fore.YELLOW}{kdj['signal']}{Style.RESET_ALL} (K:{kdj['values']['K']:.2f} D:{kdj['values']['D']:.2f} J:{kdj['values']['J']:.2f})")
     for detail in kdj['details']:
-        print(f"  • {detail}")
+        lines.append(f"  • {detail}")
     
     # BOLL
     boll = indicators["BOLL"]
-    print(f"\n{Fore.WHITE}【BOLL布林带】{Style.RESET_ALL}")
-    print(f"  信号: {Fore.YELLOW}{boll['signal']}{Style.RESET_ALL}")
+    lines.append(f"\n{Fore.WHITE}【BOLL布林带】{Style.RESET_ALL}")
+    lines.append(f"  信号: {Fore.YELLOW}{boll['signal']}{Style.RESET_ALL}")
     for detail in boll['details']:
-        print(f"  • {detail}")
+        lines.append(f"  • {detail}")
     
     # RSI
     rsi = indicators["RSI"]
-    print(f"\n{Fore.WHITE}【RSI】{Style.RESET_ALL}")
-    print(f"  信号: {Fore.YELLOW}{rsi['signal']}{Style.RESET_ALL} (RSI: {rsi['value']:.2f})")
+    lines.append(f"\n{Fore.WHITE}【RSI】{Style.RESET_ALL}")
+    lines.append(f"  信号: {Fore.YELLOW}{rsi['signal']}{Style.RESET_ALL} (RSI: {rsi['value']:.2f})")
 
 
-def display_theory_analysis(analysis: Dict):
-    """显示交易理论分析结果"""
+def display_theory_analysis(analysis: Dict, lines):
+    """显示交易理论分析结果（追加到行列表）"""
     # 斐波那契
     fib = analysis["fibonacci"]
-    print(f"\n{Fore.WHITE}【斐波那契】{Style.RESET_ALL}")
-    print(f"  区间: ${fib['low']:.2f} - ${fib['high']:.2f}")
+    lines.append(f"\n{Fore.WHITE}【斐波那契】{Style.RESET_ALL}")
+    lines.append(f"  区间: ${fib['low']:.2f} - ${fib['high']:.2f}")
     if fib['support']:
-        print(f"  支撑位: {', '.join([f'${s:.2f}' for s in fib['support'][:3]])}")
+        lines.append(f"  支撑位: {', '.join([f'${s:.2f}' for s in fib['support'][:3]])}")
     if fib['resistance']:
-        print(f"  阻力位: {', '.join([f'${r:.2f}' for r in fib['resistance'][:3]])}")
+        lines.append(f"  阻力位: {', '.join([f'${r:.2f}' for r in fib['resistance'][:3]])}")
     
     # 波浪理论
     elliott = analysis["elliott_wave"]
-    print(f"\n{Fore.WHITE}【波浪理论】{Style.RESET_ALL}")
-    print(f"  形态: {elliott['pattern']['pattern']}")
-    print(f"  预测: {elliott['prediction']['prediction']}")
-    print(f"  可信度: {elliott['prediction']['confidence']*100:.0f}%")
+    lines.append(f"\n{Fore.WHITE}【波浪理论】{Style.RESET_ALL}")
+    lines.append(f"  形态: {elliott['pattern']['pattern']}")
+    lines.append(f"  预测: {elliott['prediction']['prediction']}")
+    lines.append(f"  可信度: {elliott['prediction']['confidence']*100:.0f}%")
     
     # 缠论
     chan = analysis["chan_theory"]
-    print(f"\n{Fore.WHITE}【缠论】{Style.RESET_ALL}")
-    print(f"  趋势: {chan['trend']['trend']}")
-    print(f"  强度: {chan['trend']['strength']*100:.0f}%")
+    lines.append(f"\n{Fore.WHITE}【缠论】{Style.RESET_ALL}")
+    lines.append(f"  趋势: {chan['trend']['trend']}")
+    lines.append(f"  强度: {chan['trend']['strength']*100:.0f}%")
     
     # 威科夫
     wyckoff = analysis["wyckoff"]
-    print(f"\n{Fore.WHITE}【威科夫交易法】{Style.RESET_ALL}")
-    print(f"  阶段: {wyckoff['phase']['phase']}")
-    print(f"  操作建议: {wyckoff['phase']['action']}")
-    print(f"  供需关系: {wyckoff['supply_demand']['balance']}")
+    lines.append(f"\n{Fore.WHITE}【威科夫交易法】{Style.RESET_ALL}")
+    lines.append(f"  阶段: {wyckoff['phase']['phase']}")
+    lines.append(f"  操作建议: {wyckoff['phase']['action']}")
+    lines.append(f"  供需关系: {wyckoff['supply_demand']['balance']}")
 
 
-def display_trading_recommendations(symbol: str, analysis: Dict):
-    """显示交易建议"""
+def display_trading_recommendations(symbol: str, analysis: Dict, lines):
+    """显示交易建议（追加到行列表）"""
     rec = analysis["recommendations"]
     score = analysis["score"]
     
     # 综合评分
-    print(f"\n{Fore.YELLOW}{Style.BRIGHT}【综合评分】{Style.RESET_ALL}")
+    lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【综合评分】{Style.RESET_ALL}")
     score_color = Fore.GREEN if score['total'] > 60 else Fore.RED if score['total'] < 40 else Fore.YELLOW
-    print(f"  总分: {score_color}{Style.BRIGHT}{score['total']}/100{Style.RESET_ALL}")
-    print(f"  • 技术指标: {score['indicator_score']:.2f}")
-    print(f"  • 波浪理论: {score['elliott_score']:.2f}")
-    print(f"  • 缠论: {score['chan_score']:.2f}")
-    print(f"  • 威科夫: {score['wyckoff_score']:.2f}")
+    lines.append(f"  总分: {score_color}{Style.BRIGHT}{score['total']}/100{Style.RESET_ALL}")
+    lines.append(f"  • 技术指标: {score['indicator_score']:.2f}")
+    lines.append(f"  • 波浪理论: {score['elliott_score']:.2f}")
+    lines.append(f"  • 缠论: {score['chan_score']:.2f}")
+    lines.append(f"  • 威科夫: {score['wyckoff_score']:.2f}")
     
     # 交易方向
-    print(f"\n{Fore.YELLOW}{Style.BRIGHT}【交易建议】{Style.RESET_ALL}")
+    lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【交易建议】{Style.RESET_ALL}")
     direction_color = Fore.GREEN if rec['direction'].startswith("做多") else Fore.RED if rec['direction'].startswith("做空") else Fore.WHITE
-    print(f"  方向: {direction_color}{Style.BRIGHT}{rec['direction']}{Style.RESET_ALL}")
-    print(f"  可信度: {rec['confidence']}")
+    lines.append(f"  方向: {direction_color}{Style.BRIGHT}{rec['direction']}{Style.RESET_ALL}")
+    lines.append(f"  可信度: {rec['confidence']}")
     
     # 时间周期预测
-    print(f"\n{Fore.YELLOW}{Style.BRIGHT}【走势预测】{Style.RESET_ALL}")
+    lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【走势预测】{Style.RESET_ALL}")
     predictions = rec['predictions']
-    print(f"  15分钟: {predictions['15min']}")
-    print(f"  1小时: {predictions['1h']}")
-    print(f"  4小时: {predictions['4h']}")
-    print(f"  24小时: {predictions['24h']}")
+    lines.append(f"  15分钟: {predictions['15min']}")
+    lines.append(f"  1小时: {predictions['1h']}")
+    lines.append(f"  4小时: {predictions['4h']}")
+    lines.append(f"  24小时: {predictions['24h']}")
     
     # 止损止盈位
     if rec['stop_loss']['15min'] is not None:
-        print(f"\n{Fore.YELLOW}{Style.BRIGHT}【止损位】{Style.RESET_ALL}")
+        lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【止损位】{Style.RESET_ALL}")
         for timeframe, price in rec['stop_loss'].items():
             if price:
-                print(f"  {timeframe}: ${price:.2f}")
+                lines.append(f"  {timeframe}: ${price:.2f}")
         
-        print(f"\n{Fore.YELLOW}{Style.BRIGHT}【止盈位】{Style.RESET_ALL}")
+        lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【止盈位】{Style.RESET_ALL}")
         for timeframe, price in rec['take_profit'].items():
             if price:
-                print(f"  {timeframe}: ${price:.2f}")
+                lines.append(f"  {timeframe}: ${price:.2f}")
         
-        print(f"\n{Fore.YELLOW}{Style.BRIGHT}【风险收益比】{Style.RESET_ALL}")
+        lines.append(f"\n{Fore.YELLOW}{Style.BRIGHT}【风险收益比】{Style.RESET_ALL}")
         for timeframe, ratio in rec['risk_reward_ratio'].items():
             if ratio:
                 ratio_color = Fore.GREEN if ratio >= 2 else Fore.YELLOW if ratio >= 1 else Fore.RED
-                print(f"  {timeframe}: {ratio_color}{ratio:.2f}:1{Style.RESET_ALL}")
+                lines.append(f"  {timeframe}: {ratio_color}{ratio:.2f}:1{Style.RESET_ALL}")
     
     # 风险提示
-    print(f"\n{Fore.RED}{Style.BRIGHT}【风险提示】{Style.RESET_ALL}")
-    print(f"{Fore.RED}  • 本分析仅供参考，不构成投资建议{Style.RESET_ALL}")
-    print(f"{Fore.RED}  • 请根据自身情况设置止损，控制风险{Style.RESET_ALL}")
-    print(f"{Fore.RED}  • 市场有风险，投资需谨慎{Style.RESET_ALL}")
+    lines.append(f"\n{Fore.RED}{Style.BRIGHT}【风险提示】{Style.RESET_ALL}")
+    lines.append(f"{Fore.RED}  • 本分析仅供参考，不构成投资建议{Style.RESET_ALL}")
+    lines.append(f"{Fore.RED}  • 请根据自身情况设置止损，控制风险{Style.RESET_ALL}")
+    lines.append(f"{Fore.RED}  • 市场有风险，投资需谨慎{Style.RESET_ALL}")
 
 
-def keyboard_listener():
-    """键盘监听线程（Windows）"""
-    global realtime_mode, running, need_refresh, ws_client
+def keyboard_listener(ctx: AppContext, ws_client: BinanceWebSocket):
+    """
+    键盘监听线程（Windows）
+    
+    Args:
+        ctx: 应用上下文（配置、K线客户端、分析器均在启动时创建一次）
+        ws_client: WebSocket客户端
+    """
+    global realtime_mode, running
     
     if sys.platform != 'win32':
         return
     
-    # 保存配置用于WebSocket重连
-    config = ConfigLoader()
-    symbols = config.get_cryptocurrencies()
+    # 保存币种列表用于WebSocket重连
+    symbols = ctx.config.get_cryptocurrencies()
     
     while running:
-        if msvcrt.kbhit():
-            key = msvcrt.getch()
-            
-            # 空格键 - 切换实时/暂停
-            if key == b' ':
-                realtime_mode = not realtime_mode
-                need_refresh = True  # 切换模式后立即刷新显示
-                
-                # 控制WebSocket连接
-                if realtime_mode:
-                    # 恢复实时模式 - 重新连接WebSocket
-                    status = "实时推送"
-                    print(f"\n{Fore.YELLOW}>>> 正在切换到: {status} 模式{Style.RESET_ALL}")
-                    if ws_client:
-                        ws_client.resume(symbols, on_price_update)
-                else:
-                    # 暂停模式 - 断开WebSocket
-                    status = "暂停"
-                    print(f"\n{Fore.YELLOW}>>> 正在切换到: {status} 模式{Style.RESET_ALL}")
-                    if ws_client:
-                        ws_client.pause()
-                
-                print(f"{Fore.GREEN}✓ 已切换到: {status} 模式{Style.RESET_ALL}")
-                time.sleep(0.5)
-            
-            # R键 - 手动刷新
-            elif key.lower() == b'r':
-                config = ConfigLoader()
-                manual_refresh(config)
+        # 阻塞等待按键，无按键时线程不占用CPU
+        key = msvcrt.getwch()
+        
+        # 空格键 - 切换实时/暂停
+        if key == ' ':
+            realtime_mode = not realtime_mode
             
-            # A键 - 技术分析
-            elif key.lower() == b'a':
-                config = ConfigLoader()
-                perform_technical_analysis(config)
-                need_refresh = True  # 分析后刷新显示
+            # 控制WebSocket连接
+            if realtime_mode:
+                # 恢复实时模式 - 重新连接WebSocket
+                status = "实时推送"
+                print(f"\n{Fore.YELLOW}>>> 正在切换到: {status} 模式{Style.RESET_ALL}")
+                if ws_client:
+                    ws_client.resume(symbols, on_price_update)
+            else:
+                # 暂停模式 - 断开WebSocket
+                status = "暂停"
+                print(f"\n{Fore.YELLOW}>>> 正在切换到: {status} 模式{Style.RESET_ALL}")
+                if ws_client:
+                    ws_client.pause()
             
-            # Q键 - 退出
-            elif key.lower() == b'q':
-                running = False
+            print(f"{Fore.GREEN}✓ 已切换到: {status} 模式{Style.RESET_ALL}")
+            time.sleep(0.5)
+            request_refresh()  # 切换模式后立即刷新显示
+        
+        # R键 - 手动刷新
+        elif key.lower() == 'r':
+            manual_refresh(ctx)
+        
+        # A键 - 技术分析
+        elif key.lower() == 'a':
+            perform_technical_analysis(ctx)
+            request_refresh()  # 分析后刷新显示
+        
+        # Q键 - 退出
+        elif key.lower() == 'q':
+            running = False
+            request_refresh()  # 唤醒显示线程以便退出
+
+
+def build_frame(current_data):
+    """
+    构建完整的一帧画面
+    
+    Args:
+        current_data: 按配置顺序排列的币种数据列表
+        
+    Returns:
+        行列表
+    """
+    lines = []
+    print_header(lines)
+    
+    # 显示更新时间和状态
+    lines.append(build_time_line())
+    lines.append(SOURCE_LINE)
+    lines.append(MODE_LINE_REALTIME if realtime_mode else MODE_LINE_PAUSED)
+    lines.append("")
+    lines.append(LINE_DOUBLE)
+    
+    if current_data:
+        # 显示每个币种的信息
+        for coin in current_data:
+            print_crypto_info(coin, lines)
         
-        time.sleep(0.1)
+        # 显示简洁摘要
+        lines.append("")
+        lines.append(LINE_DOUBLE)
+        lines.append(SUMMARY_TITLE)
+        lines.append(Fore.WHITE + get_simple_summary(current_data) + RESET)
+        lines.append(LINE_DOUBLE)
+    else:
+        lines.append("")
+        lines.append(WAITING_LINE)
+    
+    # 显示控制说明
+    print_controls(lines)
+    
+    return lines
 
 
 def display_loop(config):
     """显示循环"""
-    global latest_data, running, need_refresh, realtime_mode
+    global drawn_version, need_full_redraw, tick_pending
     
-    last_refresh_time = time.time()
+    # 启动后立即绘制第一帧
+    request_refresh()
     
     while running:
-        current_time_sec = time.time()
+        # 刷新条件（由其他线程通知，无通知时不唤醒绘制）：
+        # 1. 实时模式：定时刷新线程每3秒通知
+        # 2. 需要刷新时（手动刷新、模式切换、分析结束）立即整屏重绘
+        with display_cond:
+            while running and not (need_full_redraw or tick_pending):
+                display_cond.wait(timeout=WAIT_TIMEOUT)
+            full_redraw = need_full_redraw
+            need_full_redraw = tick_pending = False
+        if not running:
+            break
         
-        # 刷新条件：
-        # 1. 实时模式：每3秒刷新
-        # 2. 暂停模式：只在需要时刷新（手动刷新或模式切换）
-        should_refresh = False
+        # 取走尚未发布的推送，再读取最新快照，版本号变化说明有价格变化
+        flush_pending_updates()
+        version, data = latest_snapshot
+        changed = version != drawn_version
+        drawn_version = version
+        # 快照已按配置顺序排列，跳过尚未收到数据的交易对
+        current_data = [coin for coin in data.values() if coin is not None]
         
-        if realtime_mode:
-            # 实时模式：每3秒刷新
-            if current_time_sec - last_refresh_time >= 3:
-                should_refresh = True
+        if changed or full_redraw or not last_frame:
+            lines = build_frame(current_data)
         else:
-            # 暂停模式：只在标志为True时刷新
-            if need_refresh:
-                should_refresh = True
-                need_refresh = False  # 重置标志
-        
-        if should_refresh:
-            # 清空屏幕
-            clear_screen()
-            
-            # 打印标题
-            print_header()
-            
-            # 显示更新时间和状态
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            mode_text = f"{Fore.GREEN}实时推送中" if realtime_mode else f"{Fore.YELLOW}已暂停（按R手动刷新）"
-            
-            print(f"{Fore.GREEN}更新时间: {Fore.YELLOW}{current_time}{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}数据源: {Fore.YELLOW}币安WebSocket{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}模式: {mode_text}{Style.RESET_ALL}\n")
-            print(Fore.CYAN + "=" * 80 + Style.RESET_ALL)
-            
-            # 获取当前数据
-            with data_lock:
-                current_data = list(latest_data.values())
-            
-            if current_data:
-                # 按币种排序
-                current_data.sort(key=lambda x: x["symbol"])
-                
-                # 显示每个币种的信息
-                for coin in current_data:
-                    print_crypto_info(coin)
-                
-                # 显示简洁摘要
-                print("\n" + Fore.CYAN + "=" * 80)
-                print(Fore.GREEN + Style.BRIGHT + "简洁概览:" + Style.RESET_ALL)
-                print(Fore.WHITE + get_simple_summary(current_data) + Style.RESET_ALL)
-                print(Fore.CYAN + "=" * 80 + Style.RESET_ALL)
-            else:
-                print(f"\n{Fore.YELLOW}正在等待数据...{Style.RESET_ALL}")
-            
-            # 显示控制说明
-            print_controls()
-            
-            last_refresh_time = current_time_sec
+            # 价格无变化，只更新时间行
+            lines = list(last_frame)
+            lines[TIME_ROW] = build_time_line()
         
-        # 短暂休眠，避免CPU占用过高
-        time.sleep(0.5)
+        paint_frame(lines, full=full_redraw)
 
 
 def main():
     """主函数"""
-    global data_lock, ws_client, running
+    global data_lock, running
     
     data_lock = threading.Lock()
     
     # 加载配置
     config = ConfigLoader()
     symbols = config.get_cryptocurrencies()
+    app_context = AppContext(config)
+    init_snapshot(config)
+    
+    # 后台预热REST连接，首次手动刷新/技术分析无需等待握手
+    threading.Thread(target=app_context.kline_client.warm_up, daemon=True).start()
     
     print(f"\n{Fore.GREEN}>>> 正在启动加密货币智能监测系统...{Style.RESET_ALL}")
     print(f"{Fore.CYAN}数据源: {Fore.YELLOW}币安WebSocket + REST API{Style.RESET_ALL}")
@@ -523,9 +826,12 @@ def main():
     # 等待初始数据
     time.sleep(2)
     
+    # 启动定时刷新线程
+    threading.Thread(target=heartbeat, daemon=True).start()
+    
     # 启动键盘监听线程（Windows）
     if sys.platform == 'win32':
-        keyboard_thread = threading.Thread(target=keyboard_listener, daemon=True)
+        keyboard_thread = threading.Thread(target=keyboard_listener, args=(app_context, ws_client), daemon=True)
         keyboard_thread.start()
         print(f"{Fore.GREEN}✓ 键盘控制已启用{Style.RESET_ALL}")
     else:
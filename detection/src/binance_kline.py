@@ -5,10 +5,107 @@
 参考: https://developers.binance.com/docs/binance-spot-api-docs/rest-api#klinecandlestick-data
 """
 
+import json
 import requests
-from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import List, Dict, Union
 from datetime import datetime, timedelta
 
+try:
+    # orjson直接解析bytes，比标准库json快数倍
+    from orjson import loads as json_loads
+except ImportError:
+    # 未安装orjson时回退到标准库（同样接受bytes）
+    from json import loads as json_loads
+
+
+# 摘要统计所需的字段
+_SUMMARY_FIELDS = itemgetter("high", "low", "volume", "trades")
+
+
+# K线结构化数据类型，字段顺序与币安K线数组一致
+KLINE_DTYPE = np.dtype([
+    ("open_time", "i8"),  # 开盘时间
+    ("open", "f8"),  # 开盘价
+    ("high", "f8"),  # 最高价
+    ("low", "f8"),  # 最低价
+    ("close", "f8"),  # 收盘价
+    ("volume", "f8"),  # 成交量
+    ("close_time", "i8"),  # 收盘时间
+    ("quote_volume", "f8"),  # 成交额
+    ("trades", "i8"),  # 成交笔数
+    ("taker_buy_base", "f8"),  # 主动买入成交量
+    ("taker_buy_quote", "f8")  # 主动买入成交额
+])
+
+
+class KlineFrame:
+    """
+    K线数据（NumPy结构化数组）
+    
+    frame["close"] 等按字段访问返回零拷贝的列视图，分析代码可直接使用整列数据；
+    同时兼容原有的按行访问方式：frame[i] 返回单根K线的字典，
+    frame[a:b] 返回切片后的KlineFrame，迭代时逐行返回字典。
+    """
+    
+    def __init__(self, data: np.ndarray):
+        """
+        初始化K线数据
+        
+        Args:
+            data: dtype为KLINE_DTYPE的结构化数组
+        """
+        self.data = data
+    
+    @classmethod
+    def from_raw(cls, raw: List[List]) -> "KlineFrame":
+        """
+        由币安接口返回的原始K线数组构建
+        
+        Args:
+            raw: 原始K线数据，每根K线为一个列表
+            
+        Returns:
+            KlineFrame
+        """
+        data = np.empty(len(raw), dtype=KLINE_DTYPE)
+        if raw:
+            # 先整体转置为按列的元组，再逐字段整列写入（类型转换在C层完成）
+            raw_columns = list(zip(*raw))
+            for index, name in enumerate(KLINE_DTYPE.names):
+                data[name] = raw_columns[index]
+        return cls(data)
+    
+    def row(self, index: int) -> Dict:
+        """
+        获取单根K线的字典形式
+        
+        Args:
+            index: K线序号，支持负数
+            
+        Returns:
+            K线数据字典
+        """
+        return dict(zip(KLINE_DTYPE.names, self.data[index].item()))
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, slice):
+            return KlineFrame(self.data[key])
+        return self.row(key)
+    
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield self.row(i)
+
 
 class BinanceKlineData:
     """币安K线数据获取器"""
@@ -21,12 +118,34 @@ class BinanceKlineData:
             api_url: API基础URL
         """
         self.api_url = api_url
+        self.max_workers = 8  # 批量请求的最大并发数
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        
+        # 连接池大小与并发数一致，并发请求结束后所有连接都能保留复用；
+        # 限流(429)和服务端临时错误(5xx)自动退避重试
+        retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
-    def get_klines(self, symbol: str, interval: str = "1h", limit: int = 100) -> List[Dict]:
+    def warm_up(self) -> bool:
+        """
+        预热连接：请求一次ping接口，提前完成TCP和TLS握手，
+        使首次真正的数据请求直接复用已建立的连接
+        
+        Returns:
+            是否成功
+        """
+        try:
+            response = self.session.get(f"{self.api_url}/api/v3/ping", timeout=5)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+    
+    def get_klines(self, symbol: str, interval: str = "1h", limit: int = 100) -> KlineFrame:
         """
         获取K线数据
         
@@ -36,7 +155,7 @@ class BinanceKlineData:
             limit: 获取数量，默认100，最大1000
             
         Returns:
-            K线数据列表
+            K线数据（KlineFrame，结构化数组，兼容按行访问），失败时返回空列表
         """
         try:
             url = f"{self.api_url}/api/v3/klines"
@@ -49,26 +168,10 @@ class BinanceKlineData:
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            klines = response.json()
-            
-            # 格式化K线数据
-            formatted_klines = []
-            for kline in klines:
-                formatted_klines.append({
-                    "open_time": kline[0],  # 开盘时间
-                    "open": float(kline[1]),  # 开盘价
-                    "high": float(kline[2]),  # 最高价
-                    "low": float(kline[3]),  # 最低价
-                    "close": float(kline[4]),  # 收盘价
-                    "volume": float(kline[5]),  # 成交量
-                    "close_time": kline[6],  # 收盘时间
-                    "quote_volume": float(kline[7]),  # 成交额
-                    "trades": int(kline[8]),  # 成交笔数
-                    "taker_buy_base": float(kline[9]),  # 主动买入成交量
-                    "taker_buy_quote": float(kline[10])  # 主动买入成交额
-                })
-            
-            return formatted_klines
+            klines = json_loads(response.content)
+            
+            # 直接转换为结构化数组
+            return KlineFrame.from_raw(klines)
             
         except requests.exceptions.RequestException as e:
             print(f"获取K线数据失败: {e}")
@@ -77,7 +180,7 @@ class BinanceKlineData:
             print(f"处理K线数据时出错: {e}")
             return []
     
-    def get_klines_for_multiple_symbols(self, symbols: List[str], interval: str = "1h", limit: int = 100) -> Dict[str, List[Dict]]:
+    def get_klines_for_multiple_symbols(self, symbols: List[str], interval: str = "1h", limit: int = 100) -> Dict[str, KlineFrame]:
         """
         批量获取多个币种的K线数据
         
@@ -87,22 +190,27 @@ class BinanceKlineData:
             limit: 每个币种获取的K线数量
             
         Returns:
-            字典，key为交易对，value为K线数据列表
+            字典，key为交易对，value为K线数据
         """
         result = {}
-        for symbol in symbols:
-            klines = self.get_klines(symbol, interval, limit)
-            if klines:
-                result[symbol] = klines
+        if not symbols:
+            return result
+        
+        # 并发请求，总耗时约为单次请求的RTT，而不是N次之和
+        with ThreadPoolExecutor(max_workers=min(len(symbols), self.max_workers)) as executor:
+            all_klines = executor.map(lambda s: self.get_klines(s, interval, limit), symbols)
+            for symbol, klines in zip(symbols, all_klines):
+                if klines:
+                    result[symbol] = klines
         return result
     
-    def format_klines_summary(self, symbol: str, klines: List[Dict]) -> str:
+    def format_klines_summary(self, symbol: str, klines: Union[KlineFrame, List[Dict]]) -> str:
         """
         格式化K线数据摘要
         
         Args:
             symbol: 交易对
-            klines: K线数据列表
+            klines: K线数据（KlineFrame或字典列表）
             
         Returns:
             格式化后的文字摘要
@@ -113,10 +221,19 @@ class BinanceKlineData:
         latest = klines[-1]
         first = klines[0]
         
-        # 计算统计数据
-        high_price = max(k["high"] for k in klines)
-        low_price = min(k["low"] for k in klines)
-        total_volume = sum(k["volume"] for k in klines)
+        # 计算统计数据（向量化聚合）
+        if isinstance(klines, KlineFrame):
+            high_price = klines["high"].max()
+            low_price = klines["low"].min()
+            total_volume = klines["volume"].sum()
+            total_trades = int(klines["trades"].sum())
+        else:
+            # 字典列表：一次遍历提取为数组
+            stats = np.array(list(map(_SUMMARY_FIELDS, klines)), dtype=np.float64)
+            high_price = stats[:, 0].max()
+            low_price = stats[:, 1].min()
+            total_volume = stats[:, 2].sum()
+            total_trades = int(stats[:, 3].sum())
         
         # 价格变化
         price_change = ((latest["close"] - first["open"]) / first["open"]) * 100
@@ -129,7 +246,7 @@ class BinanceKlineData:
         result.append(f"  期间最低: ${low_price:,.2f}")
         result.append(f"  价格变化: {price_change:+.2f}%")
         result.append(f"  总成交量: {total_volume:,.2f}")
-        result.append(f"  总成交笔数: {sum(k['trades'] for k in klines):,}")
+        result.append(f"  总成交笔数: {total_trades:,}")
         
         return "\n".join(result)
     
@@ -150,7 +267,7 @@ class BinanceKlineData:
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = json_loads(response.content)
             
             return {
                 "symbol": symbol,
@@ -164,6 +281,68 @@ class BinanceKlineData:
         except Exception as e:
             print(f"获取当前价格失败: {e}")
             return {}
+    
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取多个交易对的最新价格（24小时ticker）
+        
+        使用 /api/v3/ticker/24hr 的 symbols 参数，一次请求返回所有交易对
+        
+        Args:
+            symbols: 交易对列表，如 ["BTCUSDT", "ETHUSDT"]
+            
+        Returns:
+            字典，key为交易对（大写），value为价格数据字典
+        """
+        if not symbols:
+            return {}
+        
+        try:
+            url = f"{self.api_url}/api/v3/ticker/24hr"
+            pairs = [symbol.upper() for symbol in symbols]
+            params = {"symbols": json.dumps(pairs, separators=(",", ":"))}
+            
+            response = self.session.get(url, params=params, timeout=10)
+            if response.status_code == 400:
+                # 只要有一个交易对无效（拼写错误或已下架），整个批量请求都返回400，
+                # 此时逐个请求，只丢失无效的交易对
+                return self._get_current_prices_one_by_one(pairs)
+            response.raise_for_status()
+            
+            result = {}
+            for data in json_loads(response.content):
+                pair = data.get("symbol", "")
+                result[pair] = {
+                    "symbol": pair,
+                    "price": float(data.get("lastPrice", 0)),
+                    "change_24h": float(data.get("priceChangePercent", 0)),
+                    "volume_24h": float(data.get("quoteVolume", 0)),
+                    "high_24h": float(data.get("highPrice", 0)),
+                    "low_24h": float(data.get("lowPrice", 0))
+                }
+            
+            return result
+            
+        except Exception as e:
+            print(f"批量获取当前价格失败: {e}")
+            return {}
+    
+    def _get_current_prices_one_by_one(self, pairs: List[str]) -> Dict[str, Dict]:
+        """
+        逐个交易对获取最新价格（批量请求因无效交易对被拒绝时使用）
+        
+        Args:
+            pairs: 交易对列表（大写）
+            
+        Returns:
+            字典，key为交易对（大写），value为价格数据字典；获取失败的交易对不包含在内
+        """
+        result = {}
+        with ThreadPoolExecutor(max_workers=min(len(pairs), self.max_workers)) as executor:
+            for pair, data in zip(pairs, executor.map(self.get_current_price, pairs)):
+                if data:
+                    result[pair] = data
+        return result
 
 
 # 测试代码
@@ -5,30 +5,120 @@
 参考文档: https://developers.binance.com/docs/binance-spot-api-docs/web-socket-streams
 """
 
+import atexit
 import json
+import logging
+import queue
+import sys
 import threading
 import time
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
 from typing import Dict, Callable, List
 import websocket
 import requests
 
+try:
+    # orjson直接解析bytes/str，比标准库json快数倍
+    from orjson import loads as json_loads
+except ImportError:
+    # 未安装orjson时回退到标准库
+    from json import loads as json_loads
+
+# 接收线程中的日志先放入队列，由后台线程格式化并写出，避免接收线程阻塞在stdout上
+logger = logging.getLogger(__name__)
+
+
+_log_listener = None  # 首次connect时创建
+_log_setup_lock = threading.Lock()
+
+
+def _setup_logger() -> QueueListener:
+    """
+    配置模块日志：QueueHandler入队，QueueListener在后台线程输出到stdout
+    
+    在首次connect时调用而不是在导入时调用，只导入本模块不会启动后台线程、注册stdout处理器；
+    重复调用直接返回已创建的QueueListener
+    
+    Returns:
+        日志输出线程的QueueListener
+    """
+    global _log_listener
+    with _log_setup_lock:
+        if _log_listener is not None:
+            return _log_listener
+        
+        log_queue = queue.SimpleQueue()
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)  # 退出前输出队列中剩余的日志
+        
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _log_listener = listener
+        return listener
+
+
+# 24小时ticker推送中使用的字段：最高价、最低价、成交额、涨跌幅、最新价、事件时间、交易对
+_TICKER_FIELDS = itemgetter("h", "l", "q", "P", "c", "E", "s")
+
+
+def _parse_ticker(data: Dict) -> Dict:
+    """
+    提取24小时ticker中需要的字段
+    
+    Args:
+        data: 币安24小时ticker数据
+        
+    Returns:
+        最高价、最低价、成交额、涨跌幅
+    """
+    return {
+        "high": float(data.get("highPrice", 0)),
+        "low": float(data.get("lowPrice", 0)),
+        "volume": float(data.get("quoteVolume", 0)),
+        "change": float(data.get("priceChangePercent", 0))
+    }
+
 
 class BinanceWebSocket:
     """币安WebSocket客户端"""
     
-    def __init__(self):
-        """初始化WebSocket客户端"""
+    def __init__(self, coalesce_interval: float = 0.05):
+        """
+        初始化WebSocket客户端
+        
+        Args:
+            coalesce_interval: 回调合并间隔（秒）。间隔内同一交易对的多次推送只回调最新一次；
+                为0时每次推送都立即回调
+        """
         self.ws = None
         self.base_url = "wss://stream.binance.com:9443"
         self.api_base = "https://api.binance.com"
+        self.session = requests.Session()  # 复用连接（暂停后恢复时无需重新握手）
         
         # 存储最新价格数据
+        # 单写者设计：各交易对的条目在connect时预先创建，之后只由接收线程原地更新字段，
+        # 不再增删键，其他线程读取时字典不会改变大小，无需加锁
         self.price_data = {}
         self.ticker_data = {}
+        self._pairs = ()  # 已订阅的交易对（小写），connect时确定
+        
+        # 格式化数据缓存（每次推送时整体替换，已交给回调的字典不会再被修改）
+        self.formatted_data = {}
         
         # 回调函数
         self.on_update_callback = None
         
+        # 待回调的推送：交易对 -> 最新格式化数据（受_pending_lock保护）
+        self.coalesce_interval = coalesce_interval
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._flush_thread = None
+        
         # 运行标志
         self.running = False
         
@@ -40,6 +130,8 @@ class BinanceWebSocket:
             "DOGE": "DOGEUSDT",
             "BNB": "BNBUSDT"
         }
+        # 交易对（小写）到币种符号的反向映射，避免每次推送都做字符串替换
+        self._reverse_symbol_map = {pair.lower(): coin for coin, pair in self.symbol_map.items()}
     
     def get_initial_ticker_data(self, symbols: List[str]) -> Dict:
         """
@@ -52,21 +144,26 @@ class BinanceWebSocket:
             初始ticker数据
         """
         ticker_data = {}
+        if not symbols:
+            return ticker_data
+        
         try:
-            for symbol in symbols:
-                trading_pair = self.symbol_map.get(symbol, f"{symbol}USDT")
-                url = f"{self.api_base}/api/v3/ticker/24hr"
-                params = {"symbol": trading_pair}
-                
-                response = requests.get(url, params=params, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    ticker_data[trading_pair.lower()] = {
-                        "high": float(data.get("highPrice", 0)),
-                        "low": float(data.get("lowPrice", 0)),
-                        "volume": float(data.get("quoteVolume", 0)),
-                        "change": float(data.get("priceChangePercent", 0))
-                    }
+            # 一次请求获取所有交易对的24小时ticker，而不是逐个串行请求
+            trading_pairs = [self.symbol_map.get(symbol, f"{symbol}USDT") for symbol in symbols]
+            url = f"{self.api_base}/api/v3/ticker/24hr"
+            params = {"symbols": json.dumps(trading_pairs, separators=(",", ":"))}
+            
+            response = self.session.get(url, params=params, timeout=5)
+            if response.status_code == 200:
+                for data in json_loads(response.content):
+                    ticker_data[data["symbol"].lower()] = _parse_ticker(data)
+            elif response.status_code == 400:
+                # 只要有一个交易对无效（拼写错误或已下架），整个批量请求都返回400，
+                # 此时逐个请求，只有无效的交易对缺少初始数据
+                for trading_pair in trading_pairs:
+                    response = self.session.get(url, params={"symbol": trading_pair}, timeout=5)
+                    if response.status_code == 200:
+                        ticker_data[trading_pair.lower()] = _parse_ticker(json_loads(response.content))
         except Exception as e:
             print(f"获取初始ticker数据失败: {e}")
         
@@ -80,19 +177,30 @@ class BinanceWebSocket:
             symbols: 要监测的币种符号列表，如 ["BTC", "ETH"]
             on_update: 价格更新时的回调函数
         """
+        _setup_logger()
         self.on_update_callback = on_update
         self.running = True
         
         # 获取初始ticker数据
         print("正在获取初始数据...")
-        self.ticker_data = self.get_initial_ticker_data(symbols)
+        initial_ticker_data = self.get_initial_ticker_data(symbols)
         
-        # 构建流名称列表
+        # 构建流名称列表，并为每个交易对预先创建数据条目
         streams = []
+        pairs = []
         for symbol in symbols:
-            trading_pair = self.symbol_map.get(symbol, f"{symbol}USDT")
+            pair = self.symbol_map.get(symbol, f"{symbol}USDT").lower()
+            self._reverse_symbol_map[pair] = symbol
+            pairs.append(pair)
+            
+            ticker_info = self.ticker_data.setdefault(pair, {"high": 0.0, "low": 0.0, "volume": 0.0, "change": 0.0})
+            ticker_info.update(initial_ticker_data.get(pair, {}))
+            self.price_data.setdefault(pair, {"price": 0.0, "time": 0.0})
+            self.formatted_data.setdefault(pair, None)
+            
             # 订阅ticker流（24小时滚动统计）
-            streams.append(f"{trading_pair.lower()}@ticker")
+            streams.append(f"{pair}@ticker")
+        self._pairs = tuple(pairs)
         
         # 构建WebSocket URL（组合流）
         stream_names = "/".join(streams)
@@ -104,7 +212,7 @@ class BinanceWebSocket:
         # 创建WebSocket连接
         self.ws = websocket.WebSocketApp(
             ws_url,
-            on_message=self._on_message,
+            on_data=self._on_data,
             on_error=self._on_error,
             on_close=self._on_close,
             on_open=self._on_open
@@ -113,88 +221,152 @@ class BinanceWebSocket:
         # 在新线程中运行WebSocket
         ws_thread = threading.Thread(target=self._run_websocket, daemon=True)
         ws_thread.start()
+        
+        # 启动回调合并线程
+        if self.coalesce_interval > 0 and not (self._flush_thread and self._flush_thread.is_alive()):
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
     
     def _run_websocket(self):
         """在后台线程中运行WebSocket"""
         while self.running:
             try:
+                # 跳过websocket-client纯Python实现的逐字节UTF-8校验（每帧约百微秒），
+                # 文本帧以bytes交给回调，由JSON解析器直接处理
                 self.ws.run_forever(
                     ping_interval=20,
-                    ping_timeout=10
+                    ping_timeout=10,
+                    skip_utf8_validation=True
                 )
             except Exception as e:
-                print(f"WebSocket运行错误: {e}")
+                logger.error("WebSocket运行错误: %s", e)
                 if self.running:
-                    print("5秒后重新连接...")
+                    logger.info("5秒后重新连接...")
                     time.sleep(5)
     
     def _on_open(self, ws):
         """WebSocket连接打开时的回调"""
-        print("✓ WebSocket连接成功，开始接收实时数据...")
-        print(f"连接URL: {ws.url}")
+        logger.info("✓ WebSocket连接成功，开始接收实时数据...")
+        logger.info("连接URL: %s", ws.url)
     
-    def _on_message(self, ws, message):
-        """接收到消息时的回调"""
+    def _on_data(self, ws, data, opcode, fin):
+        """
+        接收到数据帧时的回调（原始bytes，不做str解码）
+        
+        Args:
+            ws: WebSocketApp
+            data: 帧数据
+            opcode: 帧类型
+            fin: 是否为最后一帧
+        """
+        if opcode == websocket.ABNF.OPCODE_TEXT:
+            self._handle_message(data)
+    
+    def _handle_message(self, message: bytes):
+        """
+        处理一条ticker消息
+        
+        Args:
+            message: 消息内容（UTF-8编码的JSON）
+        """
         try:
-            data = json.loads(message)
+            data = json_loads(message)
+            
+            # 组合流（/stream?streams=）的消息总是包装为 {"stream": ..., "data": ...}
+            ticker = data.get("data")
+            if ticker is None:
+                return
             
             # 处理ticker数据
-            if "data" in data:
-                ticker = data["data"]
-                if ticker.get("e") == "24hrTicker":
-                    symbol = ticker["s"].lower()  # 如 "btcusdt"
-                    
-                    # 更新ticker数据
-                    self.ticker_data[symbol] = {
-                        "high": float(ticker.get("h", 0)),
-                        "low": float(ticker.get("l", 0)),
-                        "volume": float(ticker.get("q", 0)),
-                        "change": float(ticker.get("P", 0))
-                    }
-                    
-                    # 更新价格数据
-                    self.price_data[symbol] = {
-                        "price": float(ticker.get("c", 0)),
-                        "time": ticker.get("E", 0) / 1000  # 转换为秒
-                    }
-                    
-                    # 调用更新回调
-                    if self.on_update_callback:
-                        self.on_update_callback(symbol, self.get_formatted_data(symbol))
-            else:
-                # 直接ticker数据（非stream格式）
-                if data.get("e") == "24hrTicker":
-                    symbol = data["s"].lower()
-                    
-                    self.ticker_data[symbol] = {
-                        "high": float(data.get("h", 0)),
-                        "low": float(data.get("l", 0)),
-                        "volume": float(data.get("q", 0)),
-                        "change": float(data.get("P", 0))
-                    }
-                    
-                    self.price_data[symbol] = {
-                        "price": float(data.get("c", 0)),
-                        "time": data.get("E", 0) / 1000
-                    }
-                    
-                    if self.on_update_callback:
-                        self.on_update_callback(symbol, self.get_formatted_data(symbol))
-                        
+            if ticker.get("e") == "24hrTicker":
+                # 一次取出所有字段
+                high, low, volume, change, price, event_time, pair = _TICKER_FIELDS(ticker)
+                symbol = pair.lower()  # 如 "btcusdt"
+                ticker_info = self.ticker_data.get(symbol)
+                if ticker_info is None:
+                    # 未订阅的交易对
+                    return
+                # 币安以字符串推送数值，一次map批量转换
+                high, low, volume, change, price = map(float, (high, low, volume, change, price))
+                
+                # 原地更新ticker数据
+                ticker_info["high"] = high
+                ticker_info["low"] = low
+                ticker_info["volume"] = volume
+                ticker_info["change"] = change
+                
+                # 原地更新价格数据
+                price_info = self.price_data[symbol]
+                price_info["price"] = price
+                price_info["time"] = event_time / 1000  # 转换为秒
+                
+                # 更新格式化数据缓存并调用更新回调（合并模式下只记录最新数据，由合并线程回调）
+                formatted = self._update_formatted_data(symbol)
+                if self.coalesce_interval > 0:
+                    with self._pending_lock:
+                        self._pending[symbol] = formatted
+                elif self.on_update_callback:
+                    self.on_update_callback(symbol, formatted)
+        
         except Exception as e:
-            print(f"处理消息错误: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("处理消息错误: %s", e)
+    
+    def _flush_loop(self):
+        """回调合并线程：每隔coalesce_interval秒回调一次间隔内有更新的交易对"""
+        while self.running:
+            time.sleep(self.coalesce_interval)
+            self._flush_pending()
+    
+    def _flush_pending(self):
+        """对缓存中的每个交易对回调一次最新数据"""
+        with self._pending_lock:
+            if not self._pending:
+                return
+            pending = self._pending
+            self._pending = {}
+        
+        callback = self.on_update_callback
+        if callback:
+            for symbol, formatted in pending.items():
+                try:
+                    callback(symbol, formatted)
+                except Exception as e:
+                    logger.exception("更新回调出错: %s", e)
     
     def _on_error(self, ws, error):
         """WebSocket错误时的回调"""
-        print(f"WebSocket错误: {error}")
+        logger.error("WebSocket错误: %s", error)
     
     def _on_close(self, ws, close_status_code, close_msg):
         """WebSocket关闭时的回调"""
-        print(f"WebSocket连接已关闭")
+        logger.info("WebSocket连接已关闭")
         if self.running:
-            print("正在尝试重新连接...")
+            logger.info("正在尝试重新连接...")
+    
+    def _update_formatted_data(self, symbol: str) -> Dict:
+        """
+        根据最新的价格和ticker数据重建某个交易对的格式化数据缓存
+        
+        Args:
+            symbol: 交易对符号（小写），如 "btcusdt"
+            
+        Returns:
+            新的格式化数据字典
+        """
+        price_info = self.price_data[symbol]
+        ticker_info = self.ticker_data[symbol]
+        
+        formatted = {
+            "symbol": self._reverse_symbol_map[symbol],
+            "price": price_info["price"],
+            "change_24h": ticker_info["change"],
+            "volume_24h": ticker_info["volume"],
+            "high_24h": ticker_info["high"],
+            "low_24h": ticker_info["low"],
+            "last_updated": price_info["time"]
+        }
+        self.formatted_data[symbol] = formatted
+        return formatted
     
     def get_formatted_data(self, symbol: str) -> Dict:
         """
@@ -206,11 +378,16 @@ class BinanceWebSocket:
         Returns:
             格式化的数据字典
         """
+        # 收到过推送的交易对直接返回缓存
+        formatted = self.formatted_data.get(symbol)
+        if formatted is not None:
+            return formatted
+        
         price_info = self.price_data.get(symbol, {})
         ticker_info = self.ticker_data.get(symbol, {})
         
         # 提取币种符号（去掉USDT）
-        coin_symbol = symbol.replace("usdt", "").upper()
+        coin_symbol = self._reverse_symbol_map.get(symbol) or symbol.replace("usdt", "").upper()
         
         return {
             "symbol": coin_symbol,
@@ -229,10 +406,9 @@ class BinanceWebSocket:
         Returns:
             所有币种的数据列表
         """
-        result = []
-        for symbol in self.price_data.keys():
-            result.append(self.get_formatted_data(symbol))
-        return result
+        # 遍历connect时确定的交易对元组，只返回已收到推送的交易对
+        formatted_data = self.formatted_data
+        return [formatted_data[pair] for pair in self._pairs if formatted_data[pair] is not None]
     
     def pause(self):
         """暂停WebSocket连接（停止自动重连）"""
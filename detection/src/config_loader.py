@@ -6,8 +6,32 @@
 
 import yaml
 import os
+from functools import lru_cache
 from typing import Dict, List
 
+try:
+    # libyaml的C实现，解析速度比纯Python实现快数倍
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    # PyYAML未编译libyaml绑定时回退到纯Python实现
+    from yaml import SafeLoader
+
+
+@lru_cache(maxsize=8)
+def _load_yaml(config_path: str, mtime_ns: int) -> Dict:
+    """
+    读取并解析YAML文件（按路径和修改时间缓存，文件修改后自动重新加载）
+    
+    Args:
+        config_path: 配置文件路径
+        mtime_ns: 文件修改时间（纳秒），仅作为缓存键
+        
+    Returns:
+        配置字典（多个实例共享，只读）
+    """
+    with open(config_path, 'rb') as f:
+        return yaml.load(f.read(), Loader=SafeLoader)
+
 
 class ConfigLoader:
     """配置加载器"""
@@ -30,9 +54,7 @@ class ConfigLoader:
             配置字典
         """
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            return config
+            return _load_yaml(self.config_path, os.stat(self.config_path).st_mtime_ns)
         except FileNotFoundError:
             print(f"配置文件未找到: {self.config_path}")
             return self._get_default_config()
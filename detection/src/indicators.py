@@ -5,42 +5,393 @@
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Tuple, Union
+
+
+# 指标输入数组的存储类型。改为np.float32时只有存储和逐元素运算（差分、滑动最高/最低价、真实波幅）
+# 使用单精度，均值、累计和及各递推仍按float64累加。K线数在千根以内时数组都在L1缓存中，
+# 单精度省下的带宽可以忽略，却会使高价币（如BTC）的价格只精确到约0.004，因此默认float64
+DTYPE = np.float64
+
+
+def _as_array(values, keep_float: bool = False) -> np.ndarray:
+    """
+    转换为DTYPE数组；已是DTYPE数组（如分析流程中提取的列）时直接返回，不复制也不经过np.asarray
+    
+    Args:
+        values: 价格列表或数组
+        keep_float: 为True时其他精度的浮点数组（如float32）也保持原类型直接返回，不复制也不升精度
+        
+    Returns:
+        DTYPE数组（keep_float为True时可能是输入的浮点数组）
+    """
+    if type(values) is np.ndarray and (values.dtype == DTYPE or (keep_float and values.dtype.kind == "f")):
+        return values
+    return np.asarray(values, dtype=DTYPE)
+
+
+def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    威尔德平滑：首个值为前period个值的均值，之后 avg = (avg * (period - 1) + value) / period
+    
+    Args:
+        values: 待平滑的序列
+        period: 周期
+        
+    Returns:
+        平滑后的数组（长度为len(values) - period + 1）
+    """
+    avg = float(values[:period].mean(dtype=np.float64))
+    result = [avg]
+    append = result.append
+    
+    # 递推无法向量化，在Python浮点数上迭代
+    for value in values[period:].tolist():
+        avg = (avg * (period - 1) + value) / period
+        append(avg)
+    
+    return np.array(result)
+
+
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    EMA计算核心：首个值为前period个值的SMA，之后 ema = (value - ema) * 2 / (period + 1) + ema
+    
+    Args:
+        values: DTYPE数组（调用方负责转换）
+        period: 周期
+        
+    Returns:
+        EMA值数组（长度为len(values) - period + 1，数据不足时为空数组）
+    """
+    if len(values) < period:
+        return np.empty(0)
+    
+    multiplier = 2 / (period + 1)
+    
+    # 第一个EMA值使用SMA
+    ema = float(values[:period].mean(dtype=np.float64))
+    ema_values = [ema]
+    append = ema_values.append
+    
+    # 后续使用EMA公式（递推无法向量化，在Python浮点数上迭代，避免逐个访问数组元素）
+    for value in values[period:].tolist():
+        ema = (value - ema) * multiplier + ema
+        append(ema)
+    
+    return np.array(ema_values)
+
+
+class IndicatorBatch:
+    """
+    价格序列及其累计和
+    
+    MA和BOLL都基于同一价格序列的滑动窗口统计量，构建一次累计和后，
+    任意周期的窗口和/平方和都只需两次切片相减，无需重复扫描窗口。
+    """
+    
+    def __init__(self, prices: List[float]):
+        """
+        初始化
+        
+        Args:
+            prices: 价格列表
+        """
+        self.prices = _as_array(prices)
+        
+        # 以首个价格为基准平移后再累计，避免大数相减损失精度（方差与平移无关）
+        self.offset = float(self.prices[0]) if len(self.prices) else 0.0
+        shifted = self.prices - self.offset
+        
+        # 累计和前补0：cs[i + 1] - cs[i + 1 - period] 即为以i结尾的窗口和
+        self.cs = np.concatenate(([0.0], np.cumsum(shifted, dtype=np.float64)))
+        self.cs2 = np.concatenate(([0.0], np.cumsum(np.square(shifted, dtype=np.float64))))
+    
+    def __len__(self) -> int:
+        return len(self.prices)
+    
+    def window_mean(self, period: int) -> np.ndarray:
+        """
+        各窗口均值
+        
+        Args:
+            period: 窗口长度
+            
+        Returns:
+            长度为N - period + 1的数组
+        """
+        return (self.cs[period:] - self.cs[:-period]) / period + self.offset
+    
+    def window_std(self, period: int) -> np.ndarray:
+        """
+        各窗口总体标准差：sqrt(E[x²] - E[x]²)
+        
+        Args:
+            period: 窗口长度
+            
+        Returns:
+            长度为N - period + 1的数组
+        """
+        mean = (self.cs[period:] - self.cs[:-period]) / period
+        mean_sq = (self.cs2[period:] - self.cs2[:-period]) / period
+        # 舍入误差可能使方差略小于0
+        return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+class RingBuffer:
+    """
+    定长价格环形缓冲区（预分配np.float64）
+    
+    存储区长度为容量的两倍，每个值同时写入i和i + capacity两个位置，
+    因此最近的filled个值总是一段连续内存，view()直接返回切片视图，
+    可零拷贝地传给各指标函数。
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        初始化
+        
+        Args:
+            capacity: 最多保留的价格个数
+        """
+        self.capacity = capacity
+        self.buf = np.empty(capacity * 2, dtype=np.float64)
+        self.head = 0  # 下一个写入位置
+        self.filled = 0  # 已保存的价格个数
+    
+    def __len__(self) -> int:
+        return self.filled
+    
+    def push(self, value: float):
+        """
+        追加一个价格，缓冲区已满时覆盖最早的价格
+        
+        Args:
+            value: 价格
+        """
+        head = self.head
+        self.buf[head] = value
+        self.buf[head + self.capacity] = value
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.filled < self.capacity:
+            self.filled += 1
+    
+    def view(self) -> np.ndarray:
+        """
+        按时间顺序返回已保存的价格（只读视图，不复制；之后的push会改变其内容）
+        
+        Returns:
+            长度为filled的数组
+        """
+        end = self.head + self.capacity
+        window = self.buf[end - self.filled:end]
+        window.flags.writeable = False
+        return window
+
+
+class StreamingIndicators:
+    """
+    流式指标状态
+    
+    对只在末尾追加新K线的序列，保存MA的窗口和、MACD的EMA、RSI的平均涨跌幅和ATR的递推值，
+    每根新K线O(1)更新最新值，无需对整段序列重新计算。
+    EMA、RSI、ATR的递推公式与批量计算相同，结果一致；MA的窗口和逐根加减，仅有末位舍入差异。
+    """
+    
+    def __init__(self, ma_periods: Tuple[int, ...] = (5, 10, 20, 30, 60), fast: int = 12,
+                 slow: int = 26, signal: int = 9, rsi_period: int = 14, atr_period: int = 14,
+                 range_period: int = 20):
+        """
+        初始化
+        
+        Args:
+            ma_periods: MA周期
+            fast: MACD快线周期
+            slow: MACD慢线周期
+            signal: MACD信号线周期
+            rsi_period: RSI周期
+            atr_period: ATR周期
+            range_period: 区间高低点的窗口长度
+        """
+        self.ma_periods = tuple(ma_periods)
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.range_period = range_period
+        
+        # 所有指标（含MACD/DEA的前一个值）都有值所需的最少K线数
+        self.min_length = max(max(self.ma_periods), slow + signal, rsi_period + 2, atr_period + 2)
+        self.ready = False
+    
+    def reset(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray):
+        """
+        由完整序列初始化递推状态
+        
+        Args:
+            closes: 收盘价数组（长度不少于min_length）
+            highs: 最高价数组
+            lows: 最低价数组
+        """
+        closes = _as_array(closes)
+        highs = _as_array(highs)
+        lows = _as_array(lows)
+        
+        # MA：最近max(periods)个收盘价及各周期窗口和
+        self.window = RingBuffer(max(self.ma_periods))
+        for value in closes[-self.window.capacity:].tolist():
+            self.window.push(value)
+        self.ma_sums = {period: float(closes[-period:].sum(dtype=np.float64)) for period in self.ma_periods}
+        
+        # MACD：快慢EMA和DEA的最新值，DIF/DEA保留前一个值用于判断交叉
+        ema_fast = _ema(closes, self.fast)
+        ema_slow = _ema(closes, self.slow)
+        dif = ema_fast[self.slow - self.fast:] - ema_slow
+        dea = _ema(dif, self.signal)
+        self.ema_fast = ema_fast[-1].item()
+        self.ema_slow = ema_slow[-1].item()
+        self.dif_prev, self.dif = dif[-2:].tolist()
+        self.dea_prev, self.dea = dea[-2:].tolist()
+        
+        # RSI：威尔德平滑的平均涨幅/跌幅
+        changes = np.diff(closes)
+        self.avg_gain = _wilder_smooth(np.maximum(changes, 0.0), self.rsi_period)[-1].item()
+        self.avg_loss = _wilder_smooth(np.maximum(-changes, 0.0), self.rsi_period)[-1].item()
+        
+        # ATR
+        self.atr = TechnicalIndicators.calculate_atr(highs, lows, closes, self.atr_period)[-1].item()
+        
+        # 区间高低点：单调队列保存(序号, 价格)，队首即窗口内的最高/最低价
+        self.index = len(closes) - 1
+        self.range_highs = deque()
+        self.range_lows = deque()
+        start = max(0, len(closes) - self.range_period)
+        for index in range(start, len(closes)):
+            self._push_range(index, highs[index].item(), lows[index].item())
+        
+        self.last_close = closes[-1].item()
+        self.ready = True
+    
+    def _push_range(self, index: int, high: float, low: float):
+        """单调队列加入一根K线，并移出窗口外的K线（均摊O(1)）"""
+        highs = self.range_highs
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((index, high))
+        if highs[0][0] <= index - self.range_period:
+            highs.popleft()
+        
+        lows = self.range_lows
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((index, low))
+        if lows[0][0] <= index - self.range_period:
+            lows.popleft()
+    
+    def update(self, close: float, high: float, low: float):
+        """
+        追加一根新K线，O(1)更新各指标
+        
+        Args:
+            close: 收盘价
+            high: 最高价
+            low: 最低价
+        """
+        # MA：加入新值，减去移出窗口的值
+        history = self.window.view()
+        for period in self.ma_periods:
+            self.ma_sums[period] += close - history[-period]
+        self.window.push(close)
+        
+        # MACD
+        self.ema_fast = (close - self.ema_fast) * (2 / (self.fast + 1)) + self.ema_fast
+        self.ema_slow = (close - self.ema_slow) * (2 / (self.slow + 1)) + self.ema_slow
+        self.dif_prev, self.dif = self.dif, self.ema_fast - self.ema_slow
+        self.dea_prev, self.dea = self.dea, (self.dif - self.dea) * (2 / (self.signal + 1)) + self.dea
+        
+        # RSI
+        change = close - self.last_close
+        period = self.rsi_period
+        self.avg_gain = (self.avg_gain * (period - 1) + max(change, 0.0)) / period
+        self.avg_loss = (self.avg_loss * (period - 1) + max(-change, 0.0)) / period
+        
+        # ATR
+        true_range = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+        self.atr = (self.atr * (self.atr_period - 1) + true_range) / self.atr_period
+        
+        # 区间高低点
+        self.index += 1
+        self._push_range(self.index, high, low)
+        
+        self.last_close = close
+    
+    def tails(self) -> Dict:
+        """
+        各指标的末尾值，形状与批量计算结果的末尾一致，可直接交给信号分析
+        
+        Returns:
+            {"MA": {周期: [MA]}, "MACD": {"DIF": [前值, 最新值], "DEA": [前值, 最新值], "MACD": [柱]},
+             "RSI": [RSI], "ATR": [ATR]}（各值为np.ndarray），
+            以及 "RANGE": (最近range_period根K线的最高价, 最低价)
+        """
+        if self.avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+        
+        return {
+            "MA": {period: np.array([total / period]) for period, total in self.ma_sums.items()},
+            "MACD": {
+                "DIF": np.array([self.dif_prev, self.dif]),
+                "DEA": np.array([self.dea_prev, self.dea]),
+                "MACD": np.array([(self.dif - self.dea) * 2])
+            },
+            "RSI": np.array([rsi]),
+            "ATR": np.array([self.atr]),
+            "RANGE": (self.range_highs[0][1], self.range_lows[0][1])
+        }
+
+
+def _as_batch(prices: Union[List[float], IndicatorBatch]) -> IndicatorBatch:
+    """价格列表转换为IndicatorBatch，已是IndicatorBatch时直接返回"""
+    return prices if isinstance(prices, IndicatorBatch) else IndicatorBatch(prices)
 
 
 class TechnicalIndicators:
     """技术指标计算器"""
     
     @staticmethod
-    def calculate_ma(prices: List[float], periods: List[int] = [5, 10, 20, 30, 60]) -> Dict[int, List[float]]:
+    def calculate_ma(prices: Union[List[float], IndicatorBatch],
+                     periods: List[int] = [5, 10, 20, 30, 60]) -> Dict[int, np.ndarray]:
         """
         计算移动平均线（MA）
         
+        所有周期共用一次累计和，窗口和由两次切片相减得到，计算量为O(N)
+        
         Args:
-            prices: 价格列表
+            prices: 价格列表或IndicatorBatch（与BOLL共用累计和）
             periods: 周期列表
             
         Returns:
-            各周期的MA值
+            各周期的MA值（与价格等长，前period-1个值为NaN）
         """
         result = {}
-        prices_array = np.array(prices)
+        batch = _as_batch(prices)
+        n = len(batch)
         
         for period in periods:
-            if len(prices) >= period:
-                ma = []
-                for i in range(len(prices)):
-                    if i >= period - 1:
-                        ma_value = np.mean(prices_array[i - period + 1:i + 1])
-                        ma.append(ma_value)
-                    else:
-                        ma.append(None)
+            if n >= period:
+                ma = np.full(n, np.nan)
+                ma[period - 1:] = batch.window_mean(period)
                 result[period] = ma
         
         return result
     
     @staticmethod
-    def calculate_ema(prices: List[float], period: int) -> List[float]:
+    def calculate_ema(prices: List[float], period: int) -> np.ndarray:
         """
         计算指数移动平均线（EMA）
         
@@ -49,24 +400,12 @@ class TechnicalIndicators:
             period: 周期
             
         Returns:
-            EMA值列表
+            EMA值数组（长度为N - period + 1，数据不足时为空数组）
         """
-        ema = []
-        multiplier = 2 / (period + 1)
-        
-        # 第一个EMA值使用SMA
-        sma = np.mean(prices[:period])
-        ema.append(sma)
-        
-        # 后续使用EMA公式
-        for i in range(period, len(prices)):
-            ema_value = (prices[i] - ema[-1]) * multiplier + ema[-1]
-            ema.append(ema_value)
-        
-        return ema
+        return _ema(_as_array(prices), period)
     
     @staticmethod
-    def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, List[float]]:
+    def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
         """
         计算MACD指标
         
@@ -80,24 +419,21 @@ class TechnicalIndicators:
             包含DIF、DEA、MACD的字典
         """
         if len(prices) < slow:
-            return {"DIF": [], "DEA": [], "MACD": []}
+            return {"DIF": np.empty(0), "DEA": np.empty(0), "MACD": np.empty(0)}
         
-        # 计算EMA
-        ema_fast = TechnicalIndicators.calculate_ema(prices, fast)
-        ema_slow = TechnicalIndicators.calculate_ema(prices, slow)
+        # 计算EMA（价格只转换一次，三次EMA都直接调用计算核心）
+        prices_array = _as_array(prices)
+        ema_fast = _ema(prices_array, fast)
+        ema_slow = _ema(prices_array, slow)
         
-        # 计算DIF（快线-慢线）
-        dif = []
-        for i in range(len(ema_slow)):
-            dif.append(ema_fast[i + (slow - fast)] - ema_slow[i])
+        # 计算DIF（快线-慢线，快线跳过前slow - fast个值与慢线对齐）
+        dif = ema_fast[slow - fast:] - ema_slow
         
-        # 计算DEA（DIF的EMA）
-        dea = TechnicalIndicators.calculate_ema(dif, signal)
+        # 计算DEA（DIF的EMA），DIF不足signal个时为空
+        dea = _ema(dif, signal)
         
         # 计算MACD柱（(DIF - DEA) * 2）
-        macd = []
-        for i in range(len(dea)):
-            macd.append((dif[i + (signal - 1)] - dea[i]) * 2)
+        macd = (dif[signal - 1:] - dea) * 2 if len(dea) else np.empty(0)
         
         return {
             "DIF": dif,
@@ -107,7 +443,7 @@ class TechnicalIndicators:
     
     @staticmethod
     def calculate_kdj(high: List[float], low: List[float], close: List[float], 
-                      n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, List[float]]:
+                      n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, np.ndarray]:
         """
         计算KDJ指标
         
@@ -123,47 +459,47 @@ class TechnicalIndicators:
             包含K、D、J的字典
         """
         if len(close) < n:
-            return {"K": [], "D": [], "J": []}
+            return {"K": np.empty(0), "D": np.empty(0), "J": np.empty(0)}
         
-        k_values = []
-        d_values = []
-        j_values = []
+        high_array = _as_array(high)
+        low_array = _as_array(low)
+        close_array = _as_array(close)[n - 1:]
         
+        # 计算RSV：滑动窗口的最高/最低价一次向量化求出
+        highest = sliding_window_view(high_array, n).max(axis=1)
+        lowest = sliding_window_view(low_array, n).min(axis=1)
+        span = highest - lowest
+        flat = span == 0
+        rsv = np.where(flat, 50.0, (close_array - lowest) / np.where(flat, 1.0, span) * 100)
+        
+        # 计算K、D（递推无法向量化，在Python浮点数上迭代）
         k = 50.0  # 初始K值
         d = 50.0  # 初始D值
-        
-        for i in range(n - 1, len(close)):
-            # 计算RSV
-            highest = max(high[i - n + 1:i + 1])
-            lowest = min(low[i - n + 1:i + 1])
-            
-            if highest == lowest:
-                rsv = 50
-            else:
-                rsv = (close[i] - lowest) / (highest - lowest) * 100
-            
-            # 计算K、D、J
-            k = (rsv + (m1 - 1) * k) / m1
+        k_values = []
+        d_values = []
+        for value in rsv.tolist():
+            k = (value + (m1 - 1) * k) / m1
             d = (k + (m2 - 1) * d) / m2
-            j = 3 * k - 2 * d
-            
             k_values.append(k)
             d_values.append(d)
-            j_values.append(j)
+        
+        k_array = np.array(k_values)
+        d_array = np.array(d_values)
         
         return {
-            "K": k_values,
-            "D": d_values,
-            "J": j_values
+            "K": k_array,
+            "D": d_array,
+            "J": 3 * k_array - 2 * d_array
         }
     
     @staticmethod
-    def calculate_boll(prices: List[float], period: int = 20, std_dev: float = 2.0) -> Dict[str, List[float]]:
+    def calculate_boll(prices: Union[List[float], IndicatorBatch], period: int = 20,
+                       std_dev: float = 2.0) -> Dict[str, np.ndarray]:
         """
         计算布林带（BOLL）
         
         Args:
-            prices: 价格列表
+            prices: 价格列表或IndicatorBatch（与MA共用累计和）
             period: 周期（默认20）
             std_dev: 标准差倍数（默认2）
             
@@ -171,73 +507,52 @@ class TechnicalIndicators:
             包含上轨、中轨、下轨的字典
         """
         if len(prices) < period:
-            return {"UPPER": [], "MIDDLE": [], "LOWER": []}
-        
-        upper = []
-        middle = []
-        lower = []
+            return {"UPPER": np.empty(0), "MIDDLE": np.empty(0), "LOWER": np.empty(0)}
         
-        prices_array = np.array(prices)
-        
-        for i in range(period - 1, len(prices)):
-            window = prices_array[i - period + 1:i + 1]
-            ma = np.mean(window)
-            std = np.std(window)
-            
-            middle.append(ma)
-            upper.append(ma + std_dev * std)
-            lower.append(ma - std_dev * std)
+        # 中轨和标准差都由累计和/平方累计和切片相减得到，无需扫描窗口
+        batch = _as_batch(prices)
+        middle = batch.window_mean(period)
+        band = std_dev * batch.window_std(period)
         
         return {
-            "UPPER": upper,
+            "UPPER": middle + band,
             "MIDDLE": middle,
-            "LOWER": lower
+            "LOWER": middle - band
         }
     
     @staticmethod
-    def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+    def calculate_rsi(prices: List[float], period: int = 14) -> np.ndarray:
         """
-        计算RSI指标
+        计算RSI指标（威尔德平滑）
         
         Args:
             prices: 价格列表
             period: 周期（默认14）
             
         Returns:
-            RSI值列表
+            RSI值数组（长度为N - period，数据不足时为空数组）
         """
         if len(prices) < period + 1:
-            return []
-        
-        rsi_values = []
-        gains = []
-        losses = []
+            return np.empty(0)
         
         # 计算价格变化
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i - 1]
-            gains.append(max(change, 0))
-            losses.append(abs(min(change, 0)))
-        
-        # 计算RSI
-        for i in range(period - 1, len(gains)):
-            avg_gain = np.mean(gains[i - period + 1:i + 1])
-            avg_loss = np.mean(losses[i - period + 1:i + 1])
-            
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            
-            rsi_values.append(rsi)
-        
-        return rsi_values
+        changes = np.diff(_as_array(prices))
+        gains = np.maximum(changes, 0.0)
+        losses = np.maximum(-changes, 0.0)
+        
+        # 威尔德平滑的平均涨幅/跌幅
+        avg_gain = _wilder_smooth(gains, period)
+        avg_loss = _wilder_smooth(losses, period)
+        
+        # 计算RSI（无下跌时为100）
+        no_loss = avg_loss == 0
+        rs = avg_gain / np.where(no_loss, 1.0, avg_loss)
+        return np.where(no_loss, 100.0, 100 - (100 / (1 + rs)))
     
     @staticmethod
-    def calculate_atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> List[float]:
+    def calculate_atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> np.ndarray:
         """
-        计算ATR（平均真实波幅）
+        计算ATR（平均真实波幅，威尔德平滑）
         
         Args:
             high: 最高价列表
@@ -246,28 +561,24 @@ class TechnicalIndicators:
             period: 周期（默认14）
             
         Returns:
-            ATR值列表
+            ATR值数组（长度为N - period，数据不足时为空数组）
         """
         if len(close) < period + 1:
-            return []
+            return np.empty(0)
         
-        tr_values = []
+        high_array = _as_array(high)[1:]
+        low_array = _as_array(low)[1:]
+        prev_close = _as_array(close)[:-1]
         
-        # 计算真实波幅
-        for i in range(1, len(close)):
-            tr1 = high[i] - low[i]
-            tr2 = abs(high[i] - close[i - 1])
-            tr3 = abs(low[i] - close[i - 1])
-            tr = max(tr1, tr2, tr3)
-            tr_values.append(tr)
+        # 计算真实波幅：三个分量逐元素取最大
+        tr_values = np.maximum.reduce([
+            high_array - low_array,
+            np.abs(high_array - prev_close),
+            np.abs(low_array - prev_close)
+        ])
         
         # 计算ATR
-        atr_values = []
-        for i in range(period - 1, len(tr_values)):
-            atr = np.mean(tr_values[i - period + 1:i + 1])
-            atr_values.append(atr)
-        
-        return atr_values
+        return _wilder_smooth(tr_values, period)
 
 
 # 测试代码
@@ -284,7 +595,7 @@ if __name__ == "__main__":
     
     print("\n测试MACD指标:")
     macd = indicators.calculate_macd(test_prices)
-    if macd["DIF"]:
+    if len(macd["DIF"]):
         print(f"DIF最后值: {macd['DIF'][-1]:.4f}")
         print(f"DEA最后值: {macd['DEA'][-1]:.4f}")
         print(f"MACD最后值: {macd['MACD'][-1]:.4f}")
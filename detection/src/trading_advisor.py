@@ -5,60 +5,362 @@
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
-from src.indicators import TechnicalIndicators
+from collections import OrderedDict, namedtuple
+from itertools import chain
+from operator import itemgetter
+from typing import List, Dict, Optional, Tuple, Union
+from src.binance_kline import KlineFrame
+from src.indicators import DTYPE, TechnicalIndicators, IndicatorBatch, StreamingIndicators
 from src.trading_theory import FibonacciAnalysis, ElliottWaveAnalysis, ChanTheoryAnalysis, WyckoffAnalysis
 
 
+# 分析所需的K线字段（顺序与_extract_ohlcv的返回值一致）
+_OHLCV_FIELDS = ("close", "high", "low", "volume")
+_OHLCV_GETTER = itemgetter(*_OHLCV_FIELDS)
+
+
+# 均线周期
+_MA_PERIODS = (5, 10, 20, 30, 60)
+
+# 评分输出保留的小数位数（价格等原始数值不舍入，低价币需要更多位数）
+_SCORE_DIGITS = 2
+
+# 斐波那契分析取最近多少根K线的高低点
+_FIB_WINDOW = 20
+
+# 价格与均线位置的信号文字：(周期, 是否在上方) -> 文字
+_MA_POSITION_LABELS = {
+    (period, above): f"价格在MA{period}{'上方' if above else '下方'}"
+    for period in _MA_PERIODS for above in (True, False)
+}
+
+# 止盈止损的时间周期，及各周期对应的ATR倍数
+_TIMEFRAMES = ("15min", "1h", "4h", "24h")
+_STOP_LOSS_MULTIPLIERS = np.array([1.0, 2.0, 3.0, 5.0])
+_TAKE_PROFIT_MULTIPLIERS = np.array([1.5, 3.0, 5.0, 8.0])
+
+# 综合评分的输入：技术指标加权评分及三项交易理论评分（在各分析完成时取出，评分时按属性读取）
+ScoreInputs = namedtuple("ScoreInputs", ["indicator", "elliott", "chan", "wyckoff"])
+
+# 综合评分中各项的权重
+_SCORE_WEIGHTS = ScoreInputs(indicator=0.4, elliott=0.2, chan=0.2, wyckoff=0.2)
+
+# 三项交易理论评分的最大绝对值（K线数满足分析要求时）：波浪理论可信度为0.5-0.7，最大0.4；
+# 缠论笔数不足3时强度为0、方向为-1，评分为-1；威科夫供需强度为0.4-0.7，最大0.4
+_THEORY_SCORE_LIMITS = ScoreInputs(indicator=0.0, elliott=0.4, chan=1.0, wyckoff=0.4)
+
+# 快速模式跳过交易理论分析的技术指标评分阈值：
+# 综合评分45-55为观望，即加权总分在±0.5以内；总分舍入到两位小数，再留出0.005分（加权总分0.0005）。
+# 技术指标评分绝对值超过该阈值时，理论评分取任何值，综合评分都在观望区间之外且方向不变
+_QUICK_SKIP_THRESHOLD = (0.5 + 0.0005 + sum(
+    weight * limit for weight, limit in zip(_SCORE_WEIGHTS[1:], _THEORY_SCORE_LIMITS[1:])
+)) / _SCORE_WEIGHTS.indicator
+
+
+def _indicator_score(indicators: Dict) -> float:
+    """
+    技术指标加权评分
+    
+    Args:
+        indicators: _analyze_indicators的结果
+        
+    Returns:
+        评分
+    """
+    return (
+        indicators["MA"]["score"] * 0.25 +
+        indicators["MACD"]["score"] * 0.25 +
+        indicators["KDJ"]["score"] * 0.2 +
+        indicators["BOLL"]["score"] * 0.15 +
+        indicators["RSI"]["score"] * 0.15
+    )
+
+
+def _theory_score(direction: int, strength: float) -> float:
+    """
+    交易理论评分：强度映射到[-1, 1]的幅度，方向决定正负
+    
+    Args:
+        direction: 方向（1为上涨，-1为其他）
+        strength: 强度或可信度（0-1）
+        
+    Returns:
+        评分
+    """
+    return direction * abs(strength * 2 - 1)
+
+
+def _normalize_score(total: float) -> float:
+    """
+    综合评分归一化：[-5, 5]线性映射到[0, 100]并截断
+    
+    Args:
+        total: 加权总分
+        
+    Returns:
+        0-100的评分
+    """
+    normalized = (total + 5) / 10 * 100
+    return max(0, min(100, normalized))
+
+
+def _round_payload(payload: Dict, ndigits: int = _SCORE_DIGITS) -> Dict:
+    """
+    评分结果的统一舍入：递归舍入所有浮点数（评分计算过程中不做舍入）
+    
+    Args:
+        payload: 评分字典
+        ndigits: 保留小数位数
+        
+    Returns:
+        舍入后的新字典
+    """
+    result = {}
+    for key, value in payload.items():
+        if isinstance(value, float):
+            value = round(value, ndigits)
+        elif isinstance(value, dict):
+            value = _round_payload(value, ndigits)
+        result[key] = value
+    return result
+
+
+def _skipped_theory_analyses() -> Tuple[Dict, Dict, Dict]:
+    """
+    快速模式下跳过的交易理论分析结果（与完整分析的字段一致，方向为0，不影响评分）
+    
+    Returns:
+        (波浪理论, 缠论, 威科夫)，每次返回新字典，可安全修改
+    """
+    wave_pattern = {"pattern": "未分析", "phase": "未分析", "peaks": 0, "troughs": 0}
+    elliott = {
+        "skipped": True,
+        "pattern": wave_pattern,
+        "prediction": {"prediction": "未分析", "confidence": 0, "direction": 0, "wave_info": wave_pattern}
+    }
+    chan = {
+        "skipped": True,
+        "bi_count": 0,
+        "trend": {"trend": "未分析", "strength": 0, "direction": 0, "bi_count": 0}
+    }
+    wyckoff = {
+        "skipped": True,
+        "phase": {"phase": "未分析", "action": "未分析", "price_change": 0.0, "volume_change": 0.0},
+        "supply_demand": {"balance": "未分析", "strength": 0, "trend": "未分析", "direction": 0}
+    }
+    return elliott, chan, wyckoff
+
+
+def _discard(label: str):
+    """不收集信号文字时代替list.append"""
+
+
+def _by_timeframe(levels: np.ndarray) -> Dict:
+    """按时间周期展开价位数组，None表示不设价位"""
+    if levels is None:
+        return dict.fromkeys(_TIMEFRAMES)
+    return dict(zip(_TIMEFRAMES, levels.tolist()))
+
+
+def _extract_ohlcv(klines: Union[KlineFrame, List[Dict]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    提取收盘价、最高价、最低价、成交量为4个连续的数组（类型为指标模块的DTYPE）
+    
+    Args:
+        klines: K线数据（KlineFrame或字典列表）
+        
+    Returns:
+        (closes, highs, lows, volumes)
+    """
+    if isinstance(klines, KlineFrame):
+        # 结构化数组的字段是跨步视图，复制为连续数组后各指标的向量运算更快
+        return tuple(np.ascontiguousarray(klines[name], dtype=DTYPE) for name in _OHLCV_FIELDS)
+    
+    # 字典列表：一次遍历把所有字段写入(N, 4)数组，再转置复制为按列连续的4个数组
+    n = len(klines)
+    values = np.fromiter(chain.from_iterable(map(_OHLCV_GETTER, klines)), dtype=DTYPE, count=n * 4)
+    return tuple(values.reshape(n, 4).T.copy())
+
+
+def _tail(values: np.ndarray) -> Tuple[Optional[float], float]:
+    """
+    一次切片取出数组末尾两个值（Python float）
+    
+    Args:
+        values: 指标数组（非空）
+        
+    Returns:
+        (前一个值, 最新值)，只有一个值时前一个值为None
+    """
+    tail = values[-2:].tolist()
+    if len(tail) < 2:
+        return None, tail[0]
+    return tail[0], tail[1]
+
+
+def _cross(fast_prev: Optional[float], fast: float, slow_prev: Optional[float], slow: float) -> int:
+    """
+    判断快线与慢线在最后一根K线上的交叉
+    
+    Args:
+        fast_prev: 快线（如DIF、K）前一个值，None表示数据不足
+        fast: 快线最新值
+        slow_prev: 慢线（如DEA、D）前一个值，None表示数据不足
+        slow: 慢线最新值
+        
+    Returns:
+        1为金叉，-1为死叉，0为无交叉或数据不足
+    """
+    if fast_prev is None or slow_prev is None:
+        return 0
+    # 比较结果按整数相加减，不做分支：金叉、死叉的条件互斥，至多一项为1
+    golden = (fast > slow) & (fast_prev <= slow_prev)
+    death = (fast < slow) & (fast_prev >= slow_prev)
+    return int(golden) - int(death)
+
+
 class TradingAdvisor:
     """交易顾问"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 16):
+        """
+        初始化交易顾问
+        
+        Args:
+            cache_size: 分析结果缓存条数（按K线数据内容索引，0为不缓存）
+        """
         self.indicators = TechnicalIndicators()
         self.fibonacci = FibonacciAnalysis()
         self.elliott = ElliottWaveAnalysis()
         self.chan = ChanTheoryAnalysis()
         self.wyckoff = WyckoffAnalysis()
+        
+        # 分析结果缓存：OHLCV数据的字节串 -> 分析结果（最近使用的排在最后）
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        
+        # 流式指标：上次分析的(closes, highs, lows, volumes)，本次只多一根K线时增量更新
+        self._stream = StreamingIndicators(_MA_PERIODS, range_period=_FIB_WINDOW)
+        self._prev_series = None
     
-    def analyze_comprehensive(self, klines: List[Dict]) -> Dict:
+    def analyze_comprehensive(self, klines: Union[KlineFrame, List[Dict]], quick: bool = False,
+                              collect_signals: bool = True) -> Dict:
         """
         综合分析
         
         Args:
-            klines: K线数据列表
+            klines: K线数据（KlineFrame或字典列表）
+            quick: 快速模式。技术指标信号已足够明确、交易理论无法改变交易方向时，
+                跳过波浪理论、缠论和威科夫分析（结果中标记为skipped）
+            collect_signals: 是否生成技术指标的信号文字，只需要评分和交易建议时可设为False
             
         Returns:
-            综合分析结果
+            综合分析结果（命中缓存时返回同一个字典，调用方不应修改）
         """
         if len(klines) < 30:
             return {"error": "数据不足，至少需要30根K线"}
         
-        # 提取数据
-        closes = [k['close'] for k in klines]
-        highs = [k['high'] for k in klines]
-        lows = [k['low'] for k in klines]
-        volumes = [k['volume'] for k in klines]
+        # 提取数据（按列的数组）
+        closes, highs, lows, volumes = _extract_ohlcv(klines)
+        return self._analyze_series((closes, highs, lows, volumes), quick, collect_signals)
+    
+    def analyze_streaming(self, kline: Dict, quick: bool = False, collect_signals: bool = True) -> Dict:
+        """
+        在上次分析的K线序列末尾追加一根K线后综合分析（回测或实时逐根调用）
         
-        current_price = closes[-1]
+        MA/MACD/RSI/ATR及斐波那契区间高低点按新K线增量更新，不再整段重算
         
-        # 1. 技术指标分析
-        indicators_analysis = self._analyze_indicators(closes, highs, lows, volumes)
+        Args:
+            kline: 新K线（至少包含close、high、low、volume）
+            quick: 同analyze_comprehensive
+            collect_signals: 同analyze_comprehensive
+            
+        Returns:
+            综合分析结果
+        """
+        if self._prev_series is None:
+            return {"error": "没有可追加的K线序列，请先调用analyze_comprehensive"}
+        
+        series = tuple(np.append(values, kline[field]) for values, field in zip(self._prev_series, _OHLCV_FIELDS))
+        return self._analyze_series(series, quick, collect_signals, appended=True)
+    
+    def _analyze_series(self, series: Tuple[np.ndarray, ...], quick: bool, collect_signals: bool,
+                        appended: bool = False) -> Dict:
+        """
+        经缓存执行综合分析
+        
+        Args:
+            series: (closes, highs, lows, volumes)
+            quick: 快速模式
+            collect_signals: 是否生成信号文字
+            appended: 调用方已确定series是上次序列追加一根K线（无需再比较前缀）
+            
+        Returns:
+            综合分析结果
+        """
+        # 所有分析都只依赖这四列，数据未变化（如轮询时最新K线尚未更新）时直接返回上次结果
+        key = b"".join([values.tobytes() for values in series] +
+                       [b"q" if quick else b"", b"s" if collect_signals else b""])
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            # 记录为上次的序列，流式状态下次追加时再重新初始化
+            self._prev_series = series
+            self._stream.ready = False
+            return cached
+        
+        tails = self._streaming_tails(series, appended)
+        result = self._analyze(*series, quick, collect_signals, tails)
+        
+        if self.cache_size > 0:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
-        # 2. 斐波那契分析
-        fib_analysis = self._analyze_fibonacci(closes, highs, lows, current_price)
+        return result
+    
+    def _analyze(self, closes: np.ndarray, highs: np.ndarray,
+                 lows: np.ndarray, volumes: np.ndarray, quick: bool = False,
+                 collect_signals: bool = True, tails: Optional[Dict] = None) -> Dict:
+        """执行综合分析（不经过缓存；tails为流式指标的末尾值）"""
+        current_price = float(closes[-1])
         
-        # 3. 波浪理论分析
-        elliott_analysis = self._analyze_elliott(closes)
+        # 1. 技术指标分析
+        indicators_analysis = self._analyze_indicators(closes, highs, lows, volumes, collect_signals, tails)
         
-        # 4. 缠论分析
-        chan_analysis = self._analyze_chan(highs, lows, closes)
+        # 2. 斐波那契分析（止盈止损位需要，始终计算）
+        fib_analysis = self._analyze_fibonacci(closes, highs, lows, current_price,
+                                               tails["RANGE"] if tails else None)
         
-        # 5. 威科夫分析
-        wyckoff_analysis = self._analyze_wyckoff(closes, volumes)
+        indicator_score = _indicator_score(indicators_analysis)
+        
+        if quick and abs(indicator_score) > _QUICK_SKIP_THRESHOLD:
+            # 快速模式：交易理论评分为0，不影响交易方向
+            elliott_analysis, chan_analysis, wyckoff_analysis = _skipped_theory_analyses()
+            inputs = ScoreInputs(indicator_score, 0.0, 0.0, 0.0)
+        else:
+            # 3. 波浪理论分析
+            elliott_analysis = self._analyze_elliott(closes)
+            
+            # 4. 缠论分析
+            chan_analysis = self._analyze_chan(highs, lows, closes)
+            
+            # 5. 威科夫分析
+            wyckoff_analysis = self._analyze_wyckoff(closes, volumes)
+            
+            # 理论评分：强度决定幅度，分析结果中的方向（1/-1）决定正负
+            prediction = elliott_analysis["prediction"]
+            trend = chan_analysis["trend"]
+            supply_demand = wyckoff_analysis["supply_demand"]
+            inputs = ScoreInputs(
+                indicator_score,
+                _theory_score(prediction["direction"], prediction["confidence"]),
+                _theory_score(trend["direction"], trend["strength"]),
+                _theory_score(supply_demand["direction"], supply_demand["strength"])
+            )
         
         # 6. 综合评分
-        score = self._calculate_score(indicators_analysis, fib_analysis, elliott_analysis, 
-                                      chan_analysis, wyckoff_analysis)
+        score = _round_payload(self._calculate_score(inputs))
         
         # 7. 生成交易建议
         recommendations = self._generate_recommendations(
@@ -76,34 +378,42 @@ class TradingAdvisor:
             "recommendations": recommendations
         }
     
-    def _analyze_indicators(self, closes: List[float], highs: List[float], 
-                           lows: List[float], volumes: List[float]) -> Dict:
-        """分析技术指标"""
-        current_price = closes[-1]
+    def _analyze_indicators(self, closes: np.ndarray, highs: np.ndarray, 
+                           lows: np.ndarray, volumes: np.ndarray, collect_signals: bool = True,
+                           tails: Optional[Dict] = None) -> Dict:
+        """
+        分析技术指标（collect_signals为False时各指标的信号文字列表为空；
+        tails不为None时MA/MACD/RSI/ATR使用流式指标的末尾值）
+        """
+        current_price = float(closes[-1])
         
+        # MA和BOLL共用同一份收盘价累计和
+        close_batch = IndicatorBatch(closes)
+        
+        # 序列只追加了一根K线时，MA/MACD/RSI/ATR取流式更新的末尾值，否则整段计算
         # MA均线
-        ma_dict = self.indicators.calculate_ma(closes, [5, 10, 20, 30, 60])
-        ma_signal = self._analyze_ma_signal(current_price, ma_dict)
+        ma_dict = tails["MA"] if tails else self.indicators.calculate_ma(close_batch, _MA_PERIODS)
+        ma_signal = self._analyze_ma_signal(current_price, ma_dict, collect_signals)
         
         # MACD
-        macd = self.indicators.calculate_macd(closes)
-        macd_signal = self._analyze_macd_signal(macd)
+        macd = tails["MACD"] if tails else self.indicators.calculate_macd(closes)
+        macd_signal = self._analyze_macd_signal(macd, collect_signals)
         
         # KDJ
         kdj = self.indicators.calculate_kdj(highs, lows, closes)
-        kdj_signal = self._analyze_kdj_signal(kdj)
+        kdj_signal = self._analyze_kdj_signal(kdj, collect_signals)
         
         # BOLL
-        boll = self.indicators.calculate_boll(closes)
-        boll_signal = self._analyze_boll_signal(current_price, boll)
+        boll = self.indicators.calculate_boll(close_batch)
+        boll_signal = self._analyze_boll_signal(current_price, boll, collect_signals)
         
         # RSI
-        rsi = self.indicators.calculate_rsi(closes)
-        rsi_signal = self._analyze_rsi_signal(rsi)
+        rsi = tails["RSI"] if tails else self.indicators.calculate_rsi(closes)
+        rsi_signal = self._analyze_rsi_signal(rsi, collect_signals)
         
         # ATR（波动率）
-        atr = self.indicators.calculate_atr(highs, lows, closes)
-        volatility = atr[-1] if atr else 0
+        atr = tails["ATR"] if tails else self.indicators.calculate_atr(highs, lows, closes)
+        volatility = atr[-1].item() if len(atr) else 0.0
         
         return {
             "MA": ma_signal,
@@ -112,36 +422,74 @@ class TradingAdvisor:
             "BOLL": boll_signal,
             "RSI": rsi_signal,
             "volatility": volatility,
-            "ma_values": {k: v[-1] if v else None for k, v in ma_dict.items()},
-            "macd_values": {k: v[-1] if v else None for k, v in macd.items()},
-            "kdj_values": {k: v[-1] if v else None for k, v in kdj.items()},
-            "boll_values": {k: v[-1] if v else None for k, v in boll.items()},
-            "rsi_value": rsi[-1] if rsi else None
+            # 各指标最新值由信号分析时一并取出，无需再遍历指标数组
+            "ma_values": ma_signal["values"],
+            "macd_values": macd_signal["values"],
+            "kdj_values": kdj_signal["values"],
+            "boll_values": boll_signal["values"],
+            "rsi_value": rsi_signal["value"]
         }
     
-    def _analyze_ma_signal(self, current_price: float, ma_dict: Dict) -> Dict:
+    def _streaming_tails(self, series: Tuple[np.ndarray, ...], appended: bool = False) -> Optional[Dict]:
+        """
+        流式更新MA/MACD/RSI/ATR及区间高低点
+        
+        Args:
+            series: (closes, highs, lows, volumes)
+            appended: 调用方已确定series是上次序列追加一根K线
+            
+        Returns:
+            序列为上次分析的序列追加一根K线时，返回StreamingIndicators.tails()；否则返回None
+        """
+        previous = self._prev_series
+        self._prev_series = series
+        stream = self._stream
+        closes, highs, lows, _ = series
+        
+        appended = (
+            previous is not None
+            and len(closes) == len(previous[0]) + 1
+            and len(previous[0]) >= stream.min_length
+            and (appended or all(np.array_equal(current[:-1], old) for current, old in zip(series, previous)))
+        )
+        if not appended:
+            # 滑动窗口、换币种等情况：状态作废，下次追加时再由上次的序列初始化
+            stream.ready = False
+            return None
+        
+        if not stream.ready:
+            stream.reset(*previous[:3])
+        stream.update(closes[-1].item(), highs[-1].item(), lows[-1].item())
+        return stream.tails()
+    
+    def _analyze_ma_signal(self, current_price: float, ma_dict: Dict, collect_signals: bool = True) -> Dict:
         """分析均线信号"""
         signals = []
+        add = signals.append if collect_signals else _discard  # 不需要文字时跳过收集
         score = 0
         
-        # 检查价格与各均线关系
-        for period, values in ma_dict.items():
-            if values and values[-1] is not None:
-                ma_value = values[-1]
-                if current_price > ma_value:
-                    signals.append(f"价格在MA{period}上方")
-                    score += 1
-                else:
-                    signals.append(f"价格在MA{period}下方")
-                    score -= 1
-        
-        # 检查均线排列
-        ma_values = [v[-1] for v in ma_dict.values() if v and v[-1] is not None]
-        if ma_values == sorted(ma_values, reverse=True):
-            signals.append("多头排列")
+        # 各均线最新值（Python float）只取一次，价格关系和排列判断共用
+        ma_last = [(period, values[-1].item()) for period, values in ma_dict.items()
+                   if len(values) and not np.isnan(values[-1])]
+        
+        # 检查价格与各均线关系（常用周期的文字预先生成）
+        for period, ma_value in ma_last:
+            above = current_price > ma_value
+            score += 1 if above else -1
+            if collect_signals:
+                label = _MA_POSITION_LABELS.get((period, above))
+                if label is None:
+                    label = f"价格在MA{period}{'上方' if above else '下方'}"
+                signals.append(label)
+        
+        # 检查均线排列（单次线性扫描判断单调性，短周期在前）
+        ma_values = [ma_value for _, ma_value in ma_last]
+        pairs = list(zip(ma_values, ma_values[1:]))
+        if all(shorter >= longer for shorter, longer in pairs):
+            add("多头排列")
             score += 2
-        elif ma_values == sorted(ma_values):
-            signals.append("空头排列")
+        elif all(shorter <= longer for shorter, longer in pairs):
+            add("空头排列")
             score -= 2
         
         if score > 3:
@@ -155,43 +503,45 @@ class TradingAdvisor:
         else:
             trend = "中性"
         
-        return {"trend": trend, "score": score, "signals": signals}
+        return {"trend": trend, "score": score, "signals": signals, "values": dict(ma_last)}
     
-    def _analyze_macd_signal(self, macd: Dict) -> Dict:
+    def _analyze_macd_signal(self, macd: Dict, collect_signals: bool = True) -> Dict:
         """分析MACD信号"""
-        if not macd["DIF"] or not macd["DEA"]:
-            return {"signal": "数据不足", "score": 0}
+        if not len(macd["DIF"]) or not len(macd["DEA"]):
+            # DEA不足时MACD柱也为空，DIF可能已有值
+            dif = macd["DIF"][-1].item() if len(macd["DIF"]) else None
+            return {"signal": "数据不足", "score": 0, "values": {"DIF": dif, "DEA": None, "MACD": None}}
         
-        dif = macd["DIF"][-1]
-        dea = macd["DEA"][-1]
-        macd_bar = macd["MACD"][-1]
+        dif_prev, dif = _tail(macd["DIF"])
+        dea_prev, dea = _tail(macd["DEA"])
+        macd_bar = macd["MACD"][-1].item()
         
         signals = []
+        add = signals.append if collect_signals else _discard  # 不需要文字时跳过收集
         score = 0
         
         # 金叉死叉
-        if len(macd["DIF"]) >= 2:
-            if dif > dea and macd["DIF"][-2] <= macd["DEA"][-2]:
-                signals.append("金叉（买入信号）")
-                score += 2
-            elif dif < dea and macd["DIF"][-2] >= macd["DEA"][-2]:
-                signals.append("死叉（卖出信号）")
-                score -= 2
+        cross = _cross(dif_prev, dif, dea_prev, dea)
+        score += 2 * cross
+        if cross > 0:
+            add("金叉（买入信号）")
+        elif cross < 0:
+            add("死叉（卖出信号）")
         
         # DIF和DEA位置
         if dif > 0 and dea > 0:
-            signals.append("零轴上方（多头市场）")
+            add("零轴上方（多头市场）")
             score += 1
         elif dif < 0 and dea < 0:
-            signals.append("零轴下方（空头市场）")
+            add("零轴下方（空头市场）")
             score -= 1
         
         # MACD柱状图
         if macd_bar > 0:
-            signals.append("柱状图为正（动能增强）")
+            add("柱状图为正（动能增强）")
             score += 0.5
         else:
-            signals.append("柱状图为负（动能减弱）")
+            add("柱状图为负（动能减弱）")
             score -= 0.5
         
         if score > 2:
@@ -205,43 +555,44 @@ class TradingAdvisor:
         else:
             signal = "观望"
         
-        return {"signal": signal, "score": score, "details": signals}
+        return {"signal": signal, "score": score, "details": signals,
+                "values": {"DIF": dif, "DEA": dea, "MACD": macd_bar}}
     
-    def _analyze_kdj_signal(self, kdj: Dict) -> Dict:
+    def _analyze_kdj_signal(self, kdj: Dict, collect_signals: bool = True) -> Dict:
         """分析KDJ信号"""
-        if not kdj["K"]:
-            return {"signal": "数据不足", "score": 0}
+        if not len(kdj["K"]):
+            return {"signal": "数据不足", "score": 0, "values": {"K": None, "D": None, "J": None}}
         
-        k = kdj["K"][-1]
-        d = kdj["D"][-1]
-        j = kdj["J"][-1]
+        k_prev, k = _tail(kdj["K"])
+        d_prev, d = _tail(kdj["D"])
+        j = kdj["J"][-1].item()
         
         signals = []
+        add = signals.append if collect_signals else _discard  # 不需要文字时跳过收集
         score = 0
         
         # 超买超卖
         if k > 80 and d > 80:
-            signals.append("超买区域（可能回调）")
+            add("超买区域（可能回调）")
             score -= 1
         elif k < 20 and d < 20:
-            signals.append("超卖区域（可能反弹）")
+            add("超卖区域（可能反弹）")
             score += 1
         
         # 金叉死叉
-        if len(kdj["K"]) >= 2:
-            if k > d and kdj["K"][-2] <= kdj["D"][-2]:
-                signals.append("KDJ金叉（买入）")
-                score += 1.5
-            elif k < d and kdj["K"][-2] >= kdj["D"][-2]:
-                signals.append("KDJ死叉（卖出）")
-                score -= 1.5
+        cross = _cross(k_prev, k, d_prev, d)
+        score += 1.5 * cross
+        if cross > 0:
+            add("KDJ金叉（买入）")
+        elif cross < 0:
+            add("KDJ死叉（卖出）")
         
         # J值判断
         if j > 100:
-            signals.append("J值超买")
+            add("J值超买")
             score -= 0.5
         elif j < 0:
-            signals.append("J值超卖")
+            add("J值超卖")
             score += 0.5
         
         if score > 1.5:
@@ -253,38 +604,40 @@ class TradingAdvisor:
         
         return {"signal": signal, "score": score, "details": signals, "values": {"K": k, "D": d, "J": j}}
     
-    def _analyze_boll_signal(self, current_price: float, boll: Dict) -> Dict:
+    def _analyze_boll_signal(self, current_price: float, boll: Dict, collect_signals: bool = True) -> Dict:
         """分析布林带信号"""
-        if not boll["MIDDLE"]:
-            return {"signal": "数据不足", "score": 0}
+        if not len(boll["MIDDLE"]):
+            return {"signal": "数据不足", "score": 0, "values": {"UPPER": None, "MIDDLE": None, "LOWER": None}}
         
-        upper = boll["UPPER"][-1]
-        middle = boll["MIDDLE"][-1]
-        lower = boll["LOWER"][-1]
+        upper = boll["UPPER"][-1].item()
+        middle = boll["MIDDLE"][-1].item()
+        lower = boll["LOWER"][-1].item()
         
         signals = []
+        add = signals.append if collect_signals else _discard  # 不需要文字时跳过收集
         score = 0
         
         # 价格位置
         if current_price > upper:
-            signals.append("价格突破上轨（超买）")
+            add("价格突破上轨（超买）")
             score -= 1
         elif current_price < lower:
-            signals.append("价格突破下轨（超卖）")
+            add("价格突破下轨（超卖）")
             score += 1
         elif current_price > middle:
-            signals.append("价格在中轨上方（偏多）")
+            add("价格在中轨上方（偏多）")
             score += 0.5
         else:
-            signals.append("价格在中轨下方（偏空）")
+            add("价格在中轨下方（偏空）")
             score -= 0.5
         
-        # 带宽分析
-        bandwidth = (upper - lower) / middle
-        if bandwidth > 0.1:
-            signals.append("布林带宽度较大（波动性高）")
-        else:
-            signals.append("布林带收窄（可能突破）")
+        # 带宽分析（只影响信号文字）
+        if collect_signals:
+            bandwidth = (upper - lower) / middle
+            if bandwidth > 0.1:
+                signals.append("布林带宽度较大（波动性高）")
+            else:
+                signals.append("布林带收窄（可能突破）")
         
         if score > 0.5:
             signal = "偏多"
@@ -293,29 +646,31 @@ class TradingAdvisor:
         else:
             signal = "中性"
         
-        return {"signal": signal, "score": score, "details": signals}
+        return {"signal": signal, "score": score, "details": signals,
+                "values": {"UPPER": upper, "MIDDLE": middle, "LOWER": lower}}
     
-    def _analyze_rsi_signal(self, rsi: List[float]) -> Dict:
+    def _analyze_rsi_signal(self, rsi: np.ndarray, collect_signals: bool = True) -> Dict:
         """分析RSI信号"""
-        if not rsi:
-            return {"signal": "数据不足", "score": 0}
+        if not len(rsi):
+            return {"signal": "数据不足", "score": 0, "value": None}
         
-        rsi_value = rsi[-1]
+        rsi_value = rsi[-1].item()
         
         signals = []
+        add = signals.append if collect_signals else _discard  # 不需要文字时跳过收集
         score = 0
         
         if rsi_value > 70:
-            signals.append("RSI超买（>70）")
+            add("RSI超买（>70）")
             score -= 1
         elif rsi_value < 30:
-            signals.append("RSI超卖（<30）")
+            add("RSI超卖（<30）")
             score += 1
         elif rsi_value > 50:
-            signals.append("RSI偏强（>50）")
+            add("RSI偏强（>50）")
             score += 0.5
         else:
-            signals.append("RSI偏弱（<50）")
+            add("RSI偏弱（<50）")
             score -= 0.5
         
         if score > 0.5:
@@ -327,12 +682,16 @@ class TradingAdvisor:
         
         return {"signal": signal, "score": score, "details": signals, "value": rsi_value}
     
-    def _analyze_fibonacci(self, closes: List[float], highs: List[float], 
-                          lows: List[float], current_price: float) -> Dict:
-        """斐波那契分析"""
+    def _analyze_fibonacci(self, closes: np.ndarray, highs: np.ndarray, 
+                          lows: np.ndarray, current_price: float,
+                          price_range: Optional[Tuple[float, float]] = None) -> Dict:
+        """斐波那契分析（price_range为流式维护的区间高低点，None时由数组计算）"""
         # 找出最近的高低点
-        high = max(highs[-20:])
-        low = min(lows[-20:])
+        if price_range is not None:
+            high, low = price_range
+        else:
+            high = float(highs[-_FIB_WINDOW:].max())
+            low = float(lows[-_FIB_WINDOW:].min())
         
         # 计算回调位和支撑阻力
         retracement = self.fibonacci.calculate_retracement(high, low)
@@ -346,27 +705,29 @@ class TradingAdvisor:
             "resistance": support_resistance["resistance"]
         }
     
-    def _analyze_elliott(self, closes: List[float]) -> Dict:
+    def _analyze_elliott(self, closes: np.ndarray) -> Dict:
         """波浪理论分析"""
         wave_pattern = self.elliott.identify_wave_pattern(closes)
-        prediction = self.elliott.predict_next_move(closes)
+        # 复用已识别的波浪形态，避免对同一序列再找一次峰谷
+        prediction = self.elliott.predict_next_move(closes, wave_pattern)
         
         return {
             "pattern": wave_pattern,
             "prediction": prediction
         }
     
-    def _analyze_chan(self, highs: List[float], lows: List[float], closes: List[float]) -> Dict:
+    def _analyze_chan(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Dict:
         """缠论分析"""
-        bi_list = self.chan.identify_bi(highs, lows, closes)
-        trend = self.chan.analyze_trend(bi_list)
+        # 按列的笔数组，不构建逐笔字典
+        bi_arrays = self.chan.identify_bi(highs, lows, closes, as_arrays=True)
+        trend = self.chan.analyze_trend(bi_arrays)
         
         return {
-            "bi_count": len(bi_list),
+            "bi_count": len(bi_arrays.type_code),
             "trend": trend
         }
     
-    def _analyze_wyckoff(self, closes: List[float], volumes: List[float]) -> Dict:
+    def _analyze_wyckoff(self, closes: np.ndarray, volumes: np.ndarray) -> Dict:
         """威科夫分析"""
         phase = self.wyckoff.identify_phase(closes, volumes)
         supply_demand = self.wyckoff.analyze_supply_demand(closes, volumes)
@@ -376,57 +737,23 @@ class TradingAdvisor:
             "supply_demand": supply_demand
         }
     
-    def _calculate_score(self, indicators: Dict, fib: Dict, elliott: Dict, 
-                        chan: Dict, wyckoff: Dict) -> Dict:
+    def _calculate_score(self, inputs: ScoreInputs) -> Dict:
         """计算综合评分"""
-        # 技术指标评分
-        indicator_score = (
-            indicators["MA"]["score"] * 0.25 +
-            indicators["MACD"]["score"] * 0.25 +
-            indicators["KDJ"]["score"] * 0.2 +
-            indicators["BOLL"]["score"] * 0.15 +
-            indicators["RSI"]["score"] * 0.15
-        )
-        
-        # 波浪理论评分
-        elliott_score = elliott["prediction"]["confidence"] * 2 - 1
-        if elliott["prediction"]["prediction"].find("上涨") >= 0:
-            elliott_score = abs(elliott_score)
-        else:
-            elliott_score = -abs(elliott_score)
-        
-        # 缠论评分
-        chan_score = chan["trend"]["strength"] * 2 - 1
-        if chan["trend"]["trend"].find("上涨") >= 0:
-            chan_score = abs(chan_score)
-        else:
-            chan_score = -abs(chan_score)
-        
-        # 威科夫评分
-        wyckoff_score = wyckoff["supply_demand"]["strength"] * 2 - 1
-        if wyckoff["supply_demand"]["trend"] == "上涨":
-            wyckoff_score = abs(wyckoff_score)
-        else:
-            wyckoff_score = -abs(wyckoff_score)
-        
-        # 总分
-        total_score = (
-            indicator_score * 0.4 +
-            elliott_score * 0.2 +
-            chan_score * 0.2 +
-            wyckoff_score * 0.2
+        # 总分，归一化到0-100
+        normalized_score = _normalize_score(
+            inputs.indicator * _SCORE_WEIGHTS.indicator +
+            inputs.elliott * _SCORE_WEIGHTS.elliott +
+            inputs.chan * _SCORE_WEIGHTS.chan +
+            inputs.wyckoff * _SCORE_WEIGHTS.wyckoff
         )
         
-        # 归一化到0-100
-        normalized_score = (total_score + 5) / 10 * 100
-        normalized_score = max(0, min(100, normalized_score))
-        
+        # 返回未舍入的评分，统一由_round_payload舍入
         return {
-            "total": round(normalized_score, 2),
-            "indicator_score": round(indicator_score, 2),
-            "elliott_score": round(elliott_score, 2),
-            "chan_score": round(chan_score, 2),
-            "wyckoff_score": round(wyckoff_score, 2)
+            "total": normalized_score,
+            "indicator_score": inputs.indicator,
+            "elliott_score": inputs.elliott,
+            "chan_score": inputs.chan,
+            "wyckoff_score": inputs.wyckoff
         }
     
     def _generate_recommendations(self, current_price: float, score: Dict, 
@@ -454,6 +781,7 @@ class TradingAdvisor:
         # 计算止盈止损位（基于ATR和斐波那契）
         atr = indicators["volatility"]
         
+        # 各价位为按_TIMEFRAMES排列的数组，风险收益比直接在数组上计算
         if direction.startswith("做多"):
             # 做多止损止盈
             stop_loss = self._calculate_stop_loss_long(current_price, atr, fib)
@@ -463,8 +791,8 @@ class TradingAdvisor:
             stop_loss = self._calculate_stop_loss_short(current_price, atr, fib)
             take_profit = self._calculate_take_profit_short(current_price, atr, fib)
         else:
-            stop_loss = {"15min": None, "1h": None, "4h": None, "24h": None}
-            take_profit = {"15min": None, "1h": None, "4h": None, "24h": None}
+            stop_loss = None
+            take_profit = None
         
         # 时间周期预测
         predictions = self._predict_timeframes(total_score, direction)
@@ -473,57 +801,45 @@ class TradingAdvisor:
             "direction": direction,
             "confidence": confidence,
             "score": total_score,
-            "stop_loss": stop_loss,
-            "take_profit": take_profit,
+            "stop_loss": _by_timeframe(stop_loss),
+            "take_profit": _by_timeframe(take_profit),
             "predictions": predictions,
             "risk_reward_ratio": self._calculate_risk_reward(current_price, stop_loss, take_profit)
         }
     
-    def _calculate_stop_loss_long(self, price: float, atr: float, fib: Dict) -> Dict:
+    def _calculate_stop_loss_long(self, price: float, atr: float, fib: Dict) -> np.ndarray:
         """计算做多止损位"""
-        # 使用ATR和斐波那契支撑位
+        # 使用ATR和斐波那契支撑位（15分钟不设下限）
         support = fib["support"][0] if fib["support"] else price * 0.95
+        floors = np.array([-np.inf, support, support, fib["low"]])
         
-        return {
-            "15min": round(price - atr * 1, 2),
-            "1h": round(max(price - atr * 2, support), 2),
-            "4h": round(max(price - atr * 3, support), 2),
-            "24h": round(max(price - atr * 5, fib["low"]), 2)
-        }
+        levels = np.maximum(price - atr * _STOP_LOSS_MULTIPLIERS, floors)
+        return np.round(levels, 2)
     
-    def _calculate_take_profit_long(self, price: float, atr: float, fib: Dict) -> Dict:
+    def _calculate_take_profit_long(self, price: float, atr: float, fib: Dict) -> np.ndarray:
         """计算做多止盈位"""
-        # 使用ATR和斐波那契阻力位
+        # 使用ATR和斐波那契阻力位（15分钟不设上限）
         resistance = fib["resistance"][0] if fib["resistance"] else price * 1.05
+        ceilings = np.array([np.inf, resistance, resistance, fib["high"]])
         
-        return {
-            "15min": round(price + atr * 1.5, 2),
-            "1h": round(min(price + atr * 3, resistance), 2),
-            "4h": round(min(price + atr * 5, resistance), 2),
-            "24h": round(min(price + atr * 8, fib["high"]), 2)
-        }
+        levels = np.minimum(price + atr * _TAKE_PROFIT_MULTIPLIERS, ceilings)
+        return np.round(levels, 2)
     
-    def _calculate_stop_loss_short(self, price: float, atr: float, fib: Dict) -> Dict:
+    def _calculate_stop_loss_short(self, price: float, atr: float, fib: Dict) -> np.ndarray:
         """计算做空止损位"""
         resistance = fib["resistance"][0] if fib["resistance"] else price * 1.05
+        ceilings = np.array([np.inf, resistance, resistance, fib["high"]])
         
-        return {
-            "15min": round(price + atr * 1, 2),
-            "1h": round(min(price + atr * 2, resistance), 2),
-            "4h": round(min(price + atr * 3, resistance), 2),
-            "24h": round(min(price + atr * 5, fib["high"]), 2)
-        }
+        levels = np.minimum(price + atr * _STOP_LOSS_MULTIPLIERS, ceilings)
+        return np.round(levels, 2)
     
-    def _calculate_take_profit_short(self, price: float, atr: float, fib: Dict) -> Dict:
+    def _calculate_take_profit_short(self, price: float, atr: float, fib: Dict) -> np.ndarray:
         """计算做空止盈位"""
         support = fib["support"][0] if fib["support"] else price * 0.95
+        floors = np.array([-np.inf, support, support, fib["low"]])
         
-        return {
-            "15min": round(price - atr * 1.5, 2),
-            "1h": round(max(price - atr * 3, support), 2),
-            "4h": round(max(price - atr * 5, support), 2),
-            "24h": round(max(price - atr * 8, fib["low"]), 2)
-        }
+        levels = np.maximum(price - atr * _TAKE_PROFIT_MULTIPLIERS, floors)
+        return np.round(levels, 2)
     
     def _predict_timeframes(self, score: float, direction: str) -> Dict:
         """预测不同时间周期"""
@@ -549,23 +865,20 @@ class TradingAdvisor:
                 "24h": "震荡"
             }
     
-    def _calculate_risk_reward(self, price: float, stop_loss: Dict, take_profit: Dict) -> Dict:
-        """计算风险收益比"""
-        result = {}
-        
-        for timeframe in ["15min", "1h", "4h", "24h"]:
-            sl = stop_loss.get(timeframe)
-            tp = take_profit.get(timeframe)
-            
-            if sl and tp:
-                risk = abs(price - sl)
-                reward = abs(tp - price)
-                ratio = reward / risk if risk > 0 else 0
-                result[timeframe] = round(ratio, 2)
-            else:
-                result[timeframe] = None
-        
-        return result
+    def _calculate_risk_reward(self, price: float, stop_loss: np.ndarray,
+                               take_profit: np.ndarray) -> Dict:
+        """计算风险收益比（止损/止盈为None时各周期均为None）"""
+        if stop_loss is None or take_profit is None:
+            return dict.fromkeys(_TIMEFRAMES)
+        
+        risk = np.abs(price - stop_loss)
+        reward = np.abs(take_profit - price)
+        ratios = np.round(np.divide(reward, risk, out=np.zeros(len(risk)), where=risk > 0), 2)
+        
+        # 价位为0（低价币四舍五入后）视为无效，与价位缺失同样处理
+        valid = (stop_loss != 0) & (take_profit != 0)
+        return {timeframe: ratio if ok else None
+                for timeframe, ratio, ok in zip(_TIMEFRAMES, ratios.tolist(), valid.tolist())}
 
 
 # 测试代码
@@ -5,7 +5,51 @@
 """
 
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from collections import namedtuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Tuple, Optional, Union
+from src.indicators import _as_array
+
+
+# 笔的类型编码（数组形式中使用）与名称
+_BI_TYPE_NAMES = {1: 'up', -1: 'down'}
+_BI_TYPE_CODES = {'up': 1, 'down': -1}
+
+# 缠论趋势表：最近三笔的首尾同向时的方向（0为不同向） -> (趋势, 强度, 方向)，方向1为上涨，-1为其他
+_CHAN_TRENDS = {
+    1: ("强势上涨", 0.8, 1),
+    -1: ("强势下跌", 0.8, -1),
+    0: ("震荡", 0.5, -1),
+}
+
+# 按列保存的笔：每个字段是长度为笔数的数组，type_code为1（上升笔）或-1（下降笔）
+BiArrays = namedtuple("BiArrays", ["type_code", "start_idx", "end_idx", "start_price", "end_price"])
+
+
+# 波浪趋势表：以(峰值变化符号 + 1) * 3 + (谷值变化符号 + 1)为下标，
+# 峰谷都抬高为上升趋势，都降低为下降趋势，其余为震荡
+_WAVE_TRENDS = (
+    ("下降趋势", "调整浪"), ("震荡", "盘整"), ("震荡", "盘整"),
+    ("震荡", "盘整"), ("震荡", "盘整"), ("震荡", "盘整"),
+    ("震荡", "盘整"), ("震荡", "盘整"), ("上升趋势", "推动浪"),
+)
+
+
+# 威科夫阶段表：(价格方向, 成交量是否增加, 横盘放量) -> (阶段, 操作)，未列出的组合为观察阶段
+_WYCKOFF_PHASES = {
+    (0, 1, 2): ("吸筹阶段（Accumulation）", "准备做多"),
+    (0, 1, 1): ("派发阶段（Distribution）", "准备做空"),
+    (1, 1, 0): ("上涨阶段（Markup）", "持有多单"),
+    (-1, 1, 0): ("下跌阶段（Markdown）", "持有空单或离场"),
+}
+_WYCKOFF_WAITING = ("观察阶段", "等待信号")
+
+
+def _bi_count(bi_list: Union[BiArrays, List[Dict]]) -> int:
+    """笔的数量（BiArrays本身的长度是字段数，需取某一列的长度）"""
+    if isinstance(bi_list, BiArrays):
+        return len(bi_list.type_code)
+    return len(bi_list)
 
 
 class FibonacciAnalysis:
@@ -16,6 +60,24 @@ class FibonacciAnalysis:
     # 斐波那契扩展比例
     EXTENSION_LEVELS = [1.272, 1.414, 1.618, 2.0, 2.618]
     
+    # 比例数组，各价位一次广播算出；比例递增，因此high >= low时回调位按价格从高到低排列
+    _RETRACEMENT_RATIOS = np.array(RETRACEMENT_LEVELS)
+    _EXTENSION_RATIOS = np.array(EXTENSION_LEVELS)
+    
+    @staticmethod
+    def calculate_retracement_array(high: float, low: float) -> np.ndarray:
+        """
+        计算斐波那契回调位（数组形式，顺序与RETRACEMENT_LEVELS一致）
+        
+        Args:
+            high: 高点
+            low: 低点
+            
+        Returns:
+            各回调位的价格数组
+        """
+        return high - (high - low) * FibonacciAnalysis._RETRACEMENT_RATIOS
+    
     @staticmethod
     def calculate_retracement(high: float, low: float) -> Dict[float, float]:
         """
@@ -28,13 +90,8 @@ class FibonacciAnalysis:
         Returns:
             各回调位的价格
         """
-        diff = high - low
-        levels = {}
-        
-        for ratio in FibonacciAnalysis.RETRACEMENT_LEVELS:
-            levels[ratio] = high - (diff * ratio)
-        
-        return levels
+        levels = FibonacciAnalysis.calculate_retracement_array(high, low)
+        return dict(zip(FibonacciAnalysis.RETRACEMENT_LEVELS, levels.tolist()))
     
     @staticmethod
     def calculate_extension(start: float, end: float, retrace: float) -> Dict[float, float]:
@@ -49,13 +106,8 @@ class FibonacciAnalysis:
         Returns:
             各扩展位的价格
         """
-        diff = end - start
-        levels = {}
-        
-        for ratio in FibonacciAnalysis.EXTENSION_LEVELS:
-            levels[ratio] = retrace + (diff * ratio)
-        
-        return levels
+        levels = retrace + (end - start) * FibonacciAnalysis._EXTENSION_RATIOS
+        return dict(zip(FibonacciAnalysis.EXTENSION_LEVELS, levels.tolist()))
     
     @staticmethod
     def find_support_resistance(current_price: float, high: float, low: float) -> Dict[str, List[float]]:
@@ -64,27 +116,90 @@ class FibonacciAnalysis:
         
         Args:
             current_price: 当前价格
-            high: 高点
+            high: 高点（不低于low）
             low: 低点
             
         Returns:
             支撑位和阻力位
         """
-        retracement = FibonacciAnalysis.calculate_retracement(high, low)
+        # 回调位从高到低排列，反转为升序后二分查找当前价：左侧（低于当前价）为支撑位，其余为阻力位
+        ascending = FibonacciAnalysis.calculate_retracement_array(high, low)[::-1]
+        split = int(np.searchsorted(ascending, current_price))
+        
+        return {
+            "support": ascending[:split][::-1].tolist(),
+            "resistance": ascending[split:].tolist()
+        }
+    
+    @staticmethod
+    def calculate_retracement_batch(highs: np.ndarray, lows: np.ndarray) -> np.ndarray:
+        """
+        批量计算多个币种的斐波那契回调位（一次广播）
         
-        support = []
-        resistance = []
+        Args:
+            highs: 各币种高点，长度为N
+            lows: 各币种低点，长度为N
+            
+        Returns:
+            (N, 5)数组，每行顺序与RETRACEMENT_LEVELS一致
+        """
+        highs = np.asarray(highs, dtype=np.float64)[:, None]
+        lows = np.asarray(lows, dtype=np.float64)[:, None]
+        return highs - (highs - lows) * FibonacciAnalysis._RETRACEMENT_RATIOS
+    
+    @staticmethod
+    def find_support_resistance_batch(current_prices: np.ndarray, highs: np.ndarray,
+                                      lows: np.ndarray) -> Dict[str, List[List[float]]]:
+        """
+        批量找出多个币种的支撑位和阻力位
         
-        for ratio, price in retracement.items():
-            if price < current_price:
-                support.append(price)
-            else:
-                resistance.append(price)
+        Args:
+            current_prices: 各币种当前价格，长度为N
+            highs: 各币种高点（不低于对应的低点）
+            lows: 各币种低点
+            
+        Returns:
+            支撑位和阻力位，每项为N个列表，各列表与find_support_resistance的结果一致
+        """
+        # 每行升序排列后，低于当前价的个数即支撑/阻力的分界
+        ascending = FibonacciAnalysis.calculate_retracement_batch(highs, lows)[:, ::-1]
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        splits = (ascending < current_prices[:, None]).sum(axis=1)
         
+        rows = ascending.tolist()
         return {
-            "support": sorted(support, reverse=True),
-            "resistance": sorted(resistance)
+            "support": [row[:split][::-1] for row, split in zip(rows, splits.tolist())],
+            "resistance": [row[split:] for row, split in zip(rows, splits.tolist())]
         }
+    
+    @staticmethod
+    def rolling_range(high: np.ndarray, low: np.ndarray, window: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        计算每根K线处最近window根K线的最高价和最低价（回测时整段序列一次算出）
+        
+        Args:
+            high: 最高价数组
+            low: 最低价数组
+            window: 窗口长度（默认20，与单点分析一致）
+            
+        Returns:
+            (区间高点, 区间低点)，与输入等长；第i个值等于 high[:i + 1][-window:].max()
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        n = len(high)
+        head = min(window - 1, n)
+        
+        range_high = np.empty(n)
+        range_low = np.empty(n)
+        # 前window-1根K线不足一个窗口，用累计极值
+        range_high[:head] = np.maximum.accumulate(high[:head])
+        range_low[:head] = np.minimum.accumulate(low[:head])
+        if n >= window:
+            range_high[head:] = sliding_window_view(high, window).max(axis=1)
+            range_low[head:] = sliding_window_view(low, window).min(axis=1)
+        
+        return range_high, range_low
 
 
 class ElliottWaveAnalysis:
@@ -105,27 +220,19 @@ class ElliottWaveAnalysis:
             return {"pattern": "数据不足", "phase": "未知"}
         
         # 简化的波浪识别（实际应用需要更复杂的算法）
-        peaks = []
-        troughs = []
-        
-        # 找出峰值和谷值
-        for i in range(1, len(prices) - 1):
-            if prices[i] > prices[i - 1] and prices[i] > prices[i + 1]:
-                peaks.append((i, prices[i]))
-            elif prices[i] < prices[i - 1] and prices[i] < prices[i + 1]:
-                troughs.append((i, prices[i]))
-        
-        # 判断趋势
+        # 找出峰值和谷值：前一段严格上涨、后一段严格下跌的点为峰，反之为谷
+        prices = np.asarray(prices, dtype=np.float64)
+        changes = np.diff(prices)
+        rising = changes > 0
+        falling = changes < 0
+        peaks = prices[1:-1][rising[:-1] & falling[1:]]
+        troughs = prices[1:-1][falling[:-1] & rising[1:]]
+        
+        # 判断趋势（只用最近两个峰和两个谷）
         if len(peaks) >= 2 and len(troughs) >= 2:
-            if peaks[-1][1] > peaks[-2][1] and troughs[-1][1] > troughs[-2][1]:
-                trend = "上升趋势"
-                phase = "推动浪"
-            elif peaks[-1][1] < peaks[-2][1] and troughs[-1][1] < troughs[-2][1]:
-                trend = "下降趋势"
-                phase = "调整浪"
-            else:
-                trend = "震荡"
-                phase = "盘整"
+            peak_sign = int(np.sign(peaks[-1] - peaks[-2]))
+            trough_sign = int(np.sign(troughs[-1] - troughs[-2]))
+            trend, phase = _WAVE_TRENDS[(peak_sign + 1) * 3 + trough_sign + 1]
         else:
             trend = "不确定"
             phase = "观察中"
@@ -138,22 +245,26 @@ class ElliottWaveAnalysis:
         }
     
     @staticmethod
-    def predict_next_move(prices: List[float]) -> Dict[str, any]:
+    def predict_next_move(prices: List[float], wave_info: Optional[Dict] = None) -> Dict[str, any]:
         """
         预测下一步走势
         
         Args:
             prices: 价格列表
+            wave_info: 已对同一价格序列调用identify_wave_pattern的结果，传入时不再重新识别
             
         Returns:
             预测信息
         """
-        wave_info = ElliottWaveAnalysis.identify_wave_pattern(prices)
+        if wave_info is None:
+            wave_info = ElliottWaveAnalysis.identify_wave_pattern(prices)
+        direction = -1  # 1为看涨，-1为其他（回调、下跌、震荡）
         
         if wave_info["pattern"] == "上升趋势":
             if wave_info["phase"] == "推动浪":
                 prediction = "继续上涨概率高"
                 confidence = 0.7
+                direction = 1
             else:
                 prediction = "可能回调"
                 confidence = 0.6
@@ -171,6 +282,7 @@ class ElliottWaveAnalysis:
         return {
             "prediction": prediction,
             "confidence": confidence,
+            "direction": direction,
             "wave_info": wave_info
         }
 
@@ -179,7 +291,39 @@ class ChanTheoryAnalysis:
     """缠论分析"""
     
     @staticmethod
-    def identify_bi(high: List[float], low: List[float], close: List[float]) -> List[Dict]:
+    def identify_bi_arrays(close: List[float]) -> BiArrays:
+        """
+        识别笔（按列的数组形式）
+        
+        收盘价变化方向（忽略不变的K线）每反转一次，上一笔就在反转前的K线处结束，
+        因此所有笔的端点由一次差分和符号比较向量化求出，无需逐根K线迭代
+        
+        Args:
+            close: 收盘价列表或数组
+            
+        Returns:
+            BiArrays（类型、起点序号、终点序号、起点价格、终点价格）
+        """
+        close = _as_array(close, keep_float=True)
+        if len(close) < 5:
+            empty = np.empty(0, dtype=np.int64)
+            return BiArrays(empty.astype(np.int8), empty, empty, close[:0], close[:0])
+        
+        # 第k个差分是close[k + 1] - close[k]，只保留价格有变化的位置
+        moves = np.flatnonzero(np.diff(close))
+        signs = np.sign(close[moves + 1] - close[moves]).astype(np.int8)
+        
+        # 方向与上一次变化相反的位置k：上一笔结束于第k根K线，类型为上一次变化的方向
+        turns = signs[1:] != signs[:-1]
+        end_idx = moves[1:][turns]
+        start_idx = np.zeros_like(end_idx)
+        start_idx[1:] = end_idx[:-1]
+        
+        return BiArrays(signs[:-1][turns], start_idx, end_idx, close[start_idx], close[end_idx])
+    
+    @staticmethod
+    def identify_bi(high: List[float], low: List[float], close: List[float],
+                    as_arrays: bool = False) -> Union[BiArrays, List[Dict]]:
         """
         识别笔（缠论基本单位）
         
@@ -187,84 +331,82 @@ class ChanTheoryAnalysis:
             high: 最高价列表
             low: 最低价列表
             close: 收盘价列表
+            as_arrays: 为True时直接返回BiArrays（identify_center、analyze_trend均可接受），不构建逐笔字典
             
         Returns:
-            笔的列表
+            笔的列表，as_arrays为True时为BiArrays
         """
-        if len(close) < 5:
-            return []
+        bi_arrays = ChanTheoryAnalysis.identify_bi_arrays(close)
+        if as_arrays:
+            return bi_arrays
+        
+        types, start_idx, end_idx, start_price, end_price = bi_arrays
+        return [
+            {
+                'type': _BI_TYPE_NAMES[bi_type],
+                'start': start,
+                'end': end,
+                'start_price': start_value,
+                'end_price': end_value
+            }
+            for bi_type, start, end, start_value, end_value in zip(
+                types.tolist(), start_idx.tolist(), end_idx.tolist(), start_price.tolist(), end_price.tolist())
+        ]
+    
+    @staticmethod
+    def identify_center_arrays(bi_arrays: BiArrays) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        识别中枢（数组形式，与identify_center的逐笔计算一致）
         
-        bi_list = []
-        direction = None  # 'up' or 'down'
-        start_idx = 0
-        start_price = close[0]
-        
-        for i in range(1, len(close)):
-            if direction is None:
-                if close[i] > close[i - 1]:
-                    direction = 'up'
-                elif close[i] < close[i - 1]:
-                    direction = 'down'
-            elif direction == 'up':
-                if close[i] < close[i - 1]:
-                    # 上升笔结束
-                    bi_list.append({
-                        'type': 'up',
-                        'start': start_idx,
-                        'end': i - 1,
-                        'start_price': start_price,
-                        'end_price': close[i - 1]
-                    })
-                    direction = 'down'
-                    start_idx = i - 1
-                    start_price = close[i - 1]
-            elif direction == 'down':
-                if close[i] > close[i - 1]:
-                    # 下降笔结束
-                    bi_list.append({
-                        'type': 'down',
-                        'start': start_idx,
-                        'end': i - 1,
-                        'start_price': start_price,
-                        'end_price': close[i - 1]
-                    })
-                    direction = 'up'
-                    start_idx = i - 1
-                    start_price = close[i - 1]
-        
-        return bi_list
+        Args:
+            bi_arrays: 按列的笔
+            
+        Returns:
+            (上沿, 下沿, 中线)数组，笔数少于3时为空数组
+        """
+        if len(bi_arrays.type_code) < 3:
+            return np.empty(0), np.empty(0), np.empty(0)
+        
+        # 第i、i + 1两笔的重叠区域：上沿取两笔低点的较大者，下沿取两笔高点的较小者
+        bi_low = np.minimum(bi_arrays.start_price, bi_arrays.end_price)
+        bi_high = np.maximum(bi_arrays.start_price, bi_arrays.end_price)
+        upper = np.maximum(bi_low[:-2], bi_low[1:-1])
+        lower = np.minimum(bi_high[:-2], bi_high[1:-1])
+        
+        valid = upper > lower
+        upper = upper[valid]
+        lower = lower[valid]
+        return upper, lower, (upper + lower) / 2
     
     @staticmethod
-    def identify_center(bi_list: List[Dict]) -> List[Dict]:
+    def identify_center(bi_list: Union[BiArrays, List[Dict]]) -> List[Dict]:
         """
         识别中枢
         
         Args:
-            bi_list: 笔的列表
+            bi_list: 笔（BiArrays或笔的列表）
             
         Returns:
             中枢列表
         """
-        if len(bi_list) < 3:
+        if _bi_count(bi_list) < 3:
             return []
         
+        if isinstance(bi_list, BiArrays):
+            upper, lower, middle = ChanTheoryAnalysis.identify_center_arrays(bi_list)
+            return [
+                {'upper': up, 'lower': low, 'middle': mid}
+                for up, low, mid in zip(upper.tolist(), lower.tolist(), middle.tolist())
+            ]
+        
         centers = []
         
-        for i in range(len(bi_list) - 2):
-            # 简化的中枢识别：三笔重叠区域
-            prices = [
-                bi_list[i]['start_price'],
-                bi_list[i]['end_price'],
-                bi_list[i + 1]['start_price'],
-                bi_list[i + 1]['end_price'],
-                bi_list[i + 2]['start_price'],
-                bi_list[i + 2]['end_price']
-            ]
-            
-            upper = max(min(bi_list[i]['end_price'], bi_list[i]['start_price']),
-                       min(bi_list[i + 1]['end_price'], bi_list[i + 1]['start_price']))
-            lower = min(max(bi_list[i]['end_price'], bi_list[i]['start_price']),
-                       max(bi_list[i + 1]['end_price'], bi_list[i + 1]['start_price']))
+        for first, second in zip(bi_list[:-2], bi_list[1:-1]):
+            # 简化的中枢识别：前两笔的重叠区域（每笔的端点价格只取一次）
+            start0, end0 = first['start_price'], first['end_price']
+            start1, end1 = second['start_price'], second['end_price']
+            upper = max(min(end0, start0), min(end1, start1))
+            lower = min(max(end0, start0), max(end1, start1))
             
             if upper > lower:
                 centers.append({
@@ -276,37 +418,66 @@ class ChanTheoryAnalysis:
         return centers
     
     @staticmethod
-    def analyze_trend(bi_list: List[Dict]) -> Dict[str, any]:
+    def analyze_trend(bi_list: Union[BiArrays, List[Dict]]) -> Dict[str, any]:
         """
         分析趋势（缠论）
         
         Args:
-            bi_list: 笔的列表
+            bi_list: 笔（BiArrays或笔的列表）
             
         Returns:
             趋势分析结果
         """
-        if len(bi_list) < 3:
-            return {"trend": "数据不足", "strength": 0}
+        bi_count = _bi_count(bi_list)
+        if bi_count < 3:
+            return {"trend": "数据不足", "strength": 0, "direction": -1}
         
-        # 分析最近三笔的走势
-        recent_bi = bi_list[-3:]
-        
-        if all(bi['type'] == 'up' for bi in recent_bi[::2]):
-            trend = "强势上涨"
-            strength = 0.8
-        elif all(bi['type'] == 'down' for bi in recent_bi[::2]):
-            trend = "强势下跌"
-            strength = 0.8
+        # 分析最近三笔中第一笔和第三笔的方向（类型编码：1为上升笔，-1为下降笔）
+        if isinstance(bi_list, BiArrays):
+            first, third = bi_list.type_code[-3].item(), bi_list.type_code[-1].item()
         else:
-            trend = "震荡"
-            strength = 0.5
+            first, third = _BI_TYPE_CODES[bi_list[-3]['type']], _BI_TYPE_CODES[bi_list[-1]['type']]
+        
+        # 两笔同向时按该方向查表，否则为震荡（0）
+        trend, strength, direction = _CHAN_TRENDS[first if first == third else 0]
         
         return {
             "trend": trend,
             "strength": strength,
-            "bi_count": len(bi_list)
+            "direction": direction,
+            "bi_count": bi_count
         }
+    
+    @staticmethod
+    def analyze_pipeline(close: List[float]) -> Dict[str, any]:
+        """
+        缠论完整流程：笔、中枢、趋势依次在数组上计算，中间结果不构建逐笔/逐中枢字典
+        
+        Args:
+            close: 收盘价列表或数组
+            
+        Returns:
+            包含bi（BiArrays）、centers（上沿、下沿、中线数组）、trend（analyze_trend的结果）的字典
+        """
+        bi_arrays = ChanTheoryAnalysis.identify_bi_arrays(close)
+        return {
+            "bi": bi_arrays,
+            "centers": ChanTheoryAnalysis.identify_center_arrays(bi_arrays),
+            "trend": ChanTheoryAnalysis.analyze_trend(bi_arrays)
+        }
+    
+    @staticmethod
+    def analyze_pipeline_batch(closes: Dict[str, List[float]]) -> Dict[str, Dict]:
+        """
+        对多个币种执行缠论完整流程
+        
+        Args:
+            closes: 字典，key为交易对，value为收盘价列表或数组（长度可不同）
+            
+        Returns:
+            字典，key为交易对，value为analyze_pipeline的结果
+        """
+        return {symbol: ChanTheoryAnalysis.analyze_pipeline(close) for symbol, close in closes.items()}
 
 
 class WyckoffAnalysis:
@@ -329,28 +500,18 @@ class WyckoffAnalysis:
         
         # 计算价格和成交量变化
         price_change = (prices[-1] - prices[0]) / prices[0]
-        avg_volume_early = np.mean(volumes[:len(volumes)//2])
-        avg_volume_late = np.mean(volumes[len(volumes)//2:])
+        # 前后两半的平均成交量：一次累计和同时得到前半段之和与总和
+        cumulative = np.cumsum(_as_array(volumes, keep_float=True), dtype=np.float64)
+        half = len(cumulative) // 2
+        avg_volume_early = cumulative[half - 1] / half
+        avg_volume_late = (cumulative[-1] - cumulative[half - 1]) / (len(cumulative) - half)
         volume_change = (avg_volume_late - avg_volume_early) / avg_volume_early
         
-        # 威科夫四个阶段判断
-        if abs(price_change) < 0.02 and volume_change > 0.3:
-            # 成交量增加但价格横盘
-            if prices[-1] > prices[-5]:
-                phase = "吸筹阶段（Accumulation）"
-                action = "准备做多"
-            else:
-                phase = "派发阶段（Distribution）"
-                action = "准备做空"
-        elif price_change > 0.05 and volume_change > 0:
-            phase = "上涨阶段（Markup）"
-            action = "持有多单"
-        elif price_change < -0.05 and volume_change > 0:
-            phase = "下跌阶段（Markdown）"
-            action = "持有空单或离场"
-        else:
-            phase = "观察阶段"
-            action = "等待信号"
+        # 威科夫四个阶段判断：价格方向（1为涨超5%，-1为跌超5%）、成交量是否增加、
+        # 横盘放量（价格变化小于2%且成交量增加超过30%；1为最近5根K线下跌，2为上涨）组成查表键
+        price_bucket = int(price_change > 0.05) - int(price_change < -0.05)
+        ranging = int(abs(price_change) < 0.02 and volume_change > 0.3) * (1 + int(prices[-1] > prices[-5]))
+        phase, action = _WYCKOFF_PHASES.get((price_bucket, int(volume_change > 0), ranging), _WYCKOFF_WAITING)
         
         return {
             "phase": phase,
@@ -359,6 +520,45 @@ class WyckoffAnalysis:
             "volume_change": volume_change
         }
     
+    @staticmethod
+    def identify_phase_batch(prices: np.ndarray, volumes: np.ndarray) -> Dict[str, any]:
+        """
+        批量识别多个币种的威科夫阶段（各币种K线数相同）
+        
+        Args:
+            prices: (N, T)价格数组，每行为一个币种
+            volumes: (N, T)成交量数组
+            
+        Returns:
+            阶段、操作（各N个）及价格变化、成交量变化数组，每个币种的结果与identify_phase一致
+        """
+        prices = _as_array(prices, keep_float=True)
+        volumes = _as_array(volumes, keep_float=True)
+        n_symbols, length = prices.shape
+        if length < 10:
+            return {"phase": ["数据不足"] * n_symbols, "action": ["观察"] * n_symbols}
+        
+        price_change = (prices[:, -1] - prices[:, 0]) / prices[:, 0]
+        # 所有币种的成交量累计和一次求出，前后两半的均值由两列相减得到
+        cumulative = np.cumsum(volumes, axis=1, dtype=np.float64)
+        half = length // 2
+        avg_volume_early = cumulative[:, half - 1] / half
+        avg_volume_late = (cumulative[:, -1] - cumulative[:, half - 1]) / (length - half)
+        volume_change = (avg_volume_late - avg_volume_early) / avg_volume_early
+        
+        # 查表键与identify_phase相同
+        price_bucket = (price_change > 0.05).astype(int) - (price_change < -0.05)
+        ranging = ((np.abs(price_change) < 0.02) & (volume_change > 0.3)) * (1 + (prices[:, -1] > prices[:, -5]))
+        keys = zip(price_bucket.tolist(), (volume_change > 0).astype(int).tolist(), ranging.tolist())
+        results = [_WYCKOFF_PHASES.get(key, _WYCKOFF_WAITING) for key in keys]
+        
+        return {
+            "phase": [phase for phase, _ in results],
+            "action": [action for _, action in results],
+            "price_change": price_change,
+            "volume_change": volume_change
+        }
+    
     @staticmethod
     def analyze_supply_demand(prices: List[float], volumes: List[float]) -> Dict[str, any]:
         """
@@ -372,7 +572,7 @@ class WyckoffAnalysis:
             供需分析结果
         """
         if len(prices) < 5:
-            return {"balance": "未知", "strength": 0}
+            return {"balance": "未知", "strength": 0, "direction": -1}
         
         # 分析最近的价格和成交量关系
         recent_prices = prices[-5:]
@@ -400,7 +600,8 @@ class WyckoffAnalysis:
         return {
             "balance": balance,
             "strength": strength,
-            "trend": "上涨" if price_trend > 0 else "下跌"
+            "trend": "上涨" if price_trend > 0 else "下跌",
+            "direction": 1 if price_trend > 0 else -1
         }
 
 
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""快速测试：快速模式跳过交易理论分析后，结果仍可正常显示"""
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Windows下的UTF-8输出由cli_app_interactive在导入时设置，这里不再重复包装sys.stdout
+# （重复包装时先创建的包装对象被回收，会关闭共用的底层缓冲区）
+from cli_app_interactive import display_theory_analysis, display_trading_recommendations
+from src.trading_advisor import TradingAdvisor
+from colorama import init, Fore, Style
+
+init(autoreset=True)
+
+print(Fore.CYAN + "=" * 80)
+print(Fore.YELLOW + Style.BRIGHT + ">>> 测试快速模式结果显示 <<<")
+print(Fore.CYAN + "=" * 80 + "\n")
+
+# 构造带波动的上涨K线（固定随机种子），使指标评分足够明确，快速模式会跳过交易理论分析
+rng = random.Random(32)
+klines = []
+close = 100.0
+for i in range(100):
+    close *= 1.005 + rng.gauss(0, 0.01)
+    klines.append({
+        "open": close * 0.998,
+        "high": close * 1.004,
+        "low": close * 0.995,
+        "close": close,
+        "volume": 100 + i
+    })
+
+advisor = TradingAdvisor()
+analysis = advisor.analyze_comprehensive(klines, quick=True)
+
+if not analysis["elliott_wave"].get("skipped"):
+    print(f"{Fore.RED}✗ 测试数据未触发快速模式跳过（指标评分: {analysis['score']['indicator_score']}）{Style.RESET_ALL}")
+    sys.exit(1)
+
+print(f"{Fore.GREEN}✓ 快速模式已跳过交易理论分析（指标评分: {analysis['score']['indicator_score']}）{Style.RESET_ALL}")
+
+# 跳过的分析结果应能按完整分析的字段显示
+lines = []
+try:
+    display_theory_analysis(analysis, lines)
+    display_trading_recommendations("BTC", analysis, lines)
+except KeyError as e:
+    print(f"{Fore.RED}✗ 显示快速模式结果时缺少字段: {e}{Style.RESET_ALL}")
+    sys.exit(1)
+
+print("\n".join(lines))
+
+# 跳过的分析与完整分析字段一致
+full = advisor.analyze_comprehensive(klines)
+for section in ("elliott_wave", "chan_theory", "wyckoff"):
+    skipped = analysis[section]
+    for key, value in full[section].items():
+        if key not in skipped:
+            print(f"{Fore.RED}✗ {section} 缺少字段: {key}{Style.RESET_ALL}")
+            sys.exit(1)
+        if isinstance(value, dict) and not set(value) <= set(skipped[key]):
+            print(f"{Fore.RED}✗ {section}.{key} 缺少字段: {sorted(set(value) - set(skipped[key]))}{Style.RESET_ALL}")
+            sys.exit(1)
+
+# 跳过理论分析不改变交易方向
+if analysis["recommendations"]["direction"] != full["recommendations"]["direction"]:
+    print(f"{Fore.RED}✗ 快速模式改变了交易方向: {analysis['recommendations']['direction']} / "
+          f"{full['recommendations']['direction']}{Style.RESET_ALL}")
+    sys.exit(1)
+
+print(f"\n{Fore.GREEN}✓ 快速模式结果显示测试通过！{Style.RESET_ALL}")
+print(f"\n{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
+print(f"{Fore.GREEN}测试完成！{Style.RESET_ALL}\n")